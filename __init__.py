@@ -2,73 +2,465 @@ from __future__ import annotations
 
 import contextlib
 import datetime
-import math
+import functools
+import gc
+import hashlib
 import os
-import traceback
+import sys
+import tempfile
+import threading
 from collections import defaultdict
+from collections.abc import Iterable
 from typing import Any, Literal, cast
 
-import cn2an
-import cutword
 import dateutil
 import dateutil.parser
-import yaml
 from dateutil.relativedelta import relativedelta
 
-from .classes import Datum, Struct
+from .cache import CacheInfo, ResultCache
+from .classes import Datum, Struct, build_prototypes
+from .column import parse_column as _parse_column
+from .exprs import compile_mod, reads_datum, warm
+from .scan import MAX_SPAN, Extracted, Scanner
+from .matcher import ShapeCache, ShapeInfo, TemplateIndex, struct_key
+from .numeral import merge_numerals, parse_numeral
+from .log import logger
+from .lunar import covers as lunar_covers, lunar_to_solar
+from .plan import Plan
+from .probe import Instrumentation, Trace
+from .result import ParseResult
+from .snapshot import _trusted, cache_dir, load_yaml
+from .trie import TrieTokenizer
+from .watch import Watcher
 
-with open("R:/Python314/Lib/site-packages/cn2t/templates.yaml", encoding="utf-8") as f:
-    templates = cast(dict, yaml.safe_load(f))
-with open("R:/Python314/Lib/site-packages/cn2t/lexicon.yml", encoding="utf-8") as f:
-    lexicon = cast(dict, yaml.safe_load(f))
-keywords = lexicon.keys()
-path_kwd_temp = "Z:/cn2t_kwd.txt" or os.path.expandvars("%temp%/cn2t_kwd.txt")
-with open(path_kwd_temp, "w", encoding="utf-8") as f:
-    CUTWORD_EXCLUDE = {"_NUM", ".", " "}
-    f.write("\n".join(keyword + "\t1\tN" for keyword in keywords if keyword not in CUTWORD_EXCLUDE))
-cutter = cutword.Cutter(dict_name=path_kwd_temp)
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LEXICON_PATH = os.path.join(PACKAGE_DIR, "lexicon.yml")
+DEFAULT_TEMPLATES_PATH = os.path.join(PACKAGE_DIR, "templates.yaml")
+CUTWORD_EXCLUDE = {"_NUM", ".", " "}
 
 
-def to_num(s: str) -> int | None:
+def write_keyword_dict(keywords, dict_dir: str | None = None) -> str:
+    # cutword 的自定义词典只能从文件加载，所以得落一份盘；文件名带内容哈希，词库没变就不重写。
+    # 默认放自己的缓存目录：公共临时目录里的同名文件可能是别人抢先放的（塞词、或者是个符号链接），不能直接拿来用
+    content = "\n".join(keyword + "\t1\tN" for keyword in keywords if keyword not in CUTWORD_EXCLUDE)
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+    directory = dict_dir or cache_dir()
+    if directory is None:
+        # 连自己的缓存目录都没有：每次新建一个只有自己能读写的文件，不复用
+        fd, path = tempfile.mkstemp(prefix=f"cn2t_kwd_{digest}_", suffix=".txt")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+    path = os.path.join(directory, f"cn2t_kwd_{digest}.txt")
+    if not _same_content(path, content):
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, path)  # 是符号链接的话换掉的是链接本身，不会写到它指的地方去
+    return path
+
+
+def _same_content(path: str, content: str) -> bool:
     try:
-        return int(s)
-    except ValueError:
+        with open(path, encoding="utf-8") as f:
+            return _trusted(os.fstat(f.fileno())) and f.read() == content
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
+class Engine:
+    # 加载好的词库、模板和分词器，加载完之后只读，可以在线程之间共享
+    def __init__(self, lexicon: dict, templates: dict, cutter, cache_size: int = 1024, shape_cache_size: int = 4096):
+        self.lexicon = lexicon
+        self.templates = templates
+        self.keywords = lexicon.keys()
+        self.cutter = cutter
+        self.index = TemplateIndex(templates)
+        self.prototypes = build_prototypes(lexicon)
+        # 解析结果缓存跟着 Engine 走，词库一换缓存自然就跟着换了
+        self.cache = ResultCache(cache_size) if cache_size > 0 else None
+        # second_parser 按结构体形状记下匹配上的模板，数字不一样的同形状输入不用再一个个试
+        self.shapes = ShapeCache(self.index.templates, shape_cache_size) if shape_cache_size > 0 else None
+        warm(lexicon, templates)
+
+    @functools.cached_property
+    def scanner(self) -> Scanner:
+        # 只有 extract 用得到，第一次用的时候再建
+        return Scanner(self.lexicon)
+
+    @classmethod
+    def load(
+        cls,
+        lexicon_path: str = DEFAULT_LEXICON_PATH,
+        templates_path: str = DEFAULT_TEMPLATES_PATH,
+        use_snapshot: bool = True,
+        dict_dir: str | None = None,
+        cache_size: int = 1024,
+        tokenizer: Literal["cutword", "trie"] = "cutword",
+        shape_cache_size: int = 4096,
+    ) -> Engine:
+        templates = cast(dict, load_yaml(templates_path, use_snapshot=use_snapshot))
+        lexicon = cast(dict, load_yaml(lexicon_path, use_snapshot=use_snapshot))
+        if tokenizer == "trie":
+            cutter = TrieTokenizer(lexicon.keys())
+        elif tokenizer == "cutword":
+            # cutword 导入和加载词典的时候会往 stdout 打日志，会把 python -m cn2t 的输出搞乱，挪到 stderr 去
+            with contextlib.redirect_stdout(sys.stderr):
+                import cutword  # 这玩意导入要好一会，用到了再导
+
+                cutter = cutword.Cutter(dict_name=write_keyword_dict(lexicon.keys(), dict_dir))
+        else:
+            raise ValueError(f"不认识的分词器: {tokenizer}")
+        return cls(lexicon, templates, cutter, cache_size, shape_cache_size)
+
+
+class Parser:
+    # 导入的时候什么都不做，第一次用到的时候才加载词库；同一个 Parser 可以在多个线程里共用
+    def __init__(
+        self,
+        lexicon_path: str | None = None,
+        templates_path: str | None = None,
+        use_snapshot: bool = True,
+        dict_dir: str | None = None,
+        cache_size: int = 1024,
+        tokenizer: Literal["cutword", "trie"] = "cutword",
+        instrumentation: Instrumentation | None = None,
+        shape_cache_size: int = 4096,
+    ):
+        self.lexicon_path = lexicon_path or DEFAULT_LEXICON_PATH
+        self.templates_path = templates_path or DEFAULT_TEMPLATES_PATH
+        self.use_snapshot = use_snapshot
+        self.dict_dir = dict_dir
+        self.cache_size = cache_size
+        self.tokenizer = tokenizer
+        self.instrumentation = instrumentation  # 随时可以换、可以设回 None
+        self.shape_cache_size = shape_cache_size  # 0 表示每次都完整匹配模板
+        self._engine: Engine | None = None
+        # 第一次加载和 reload 共用这一把，不然第一次加载慢的话会把 reload 刚换上的新 Engine 盖掉；解析只在还没加载的时候拿
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self) -> Engine:
+        if (engine := self._engine) is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = Engine.load(
+                        self.lexicon_path, self.templates_path, self.use_snapshot, self.dict_dir, self.cache_size, self.tokenizer, self.shape_cache_size
+                    )
+                engine = self._engine
+        return engine
+
+    def warm(self) -> Parser:
+        self.engine
+        return self
+
+    def reload(self) -> Engine:
+        """重新读词库和模板，在当前线程里把新的 Engine（分词器、模板索引、缓存）整个建好再换上去。
+        换的时候正在跑的解析手里拿的还是旧的 Engine，照常跑完；之后的解析用新的，旧的缓存跟着旧 Engine 一起扔掉。
+        读不出来（yaml 写错了之类）就抛异常，旧的接着用"""
+        with self._lock:
+            old = self._engine
+            engine = Engine.load(
+                self.lexicon_path, self.templates_path, self.use_snapshot, self.dict_dir, self.cache_size, self.tokenizer, self.shape_cache_size
+            )
+            if old is not None and "scanner" in vars(old):
+                engine.scanner  # 旧的用过 extract 的话，新的也先建好，别让换上去之后的第一个请求来建
+            self._engine = engine  # 一次赋值，别的线程要么看到旧的要么看到新的
+        return engine
+
+    def watch(self, interval: float = 1.0) -> Watcher:
+        """开一个后台线程盯着词库和模板文件，改了就 reload；返回的 Watcher 调 stop() 停掉"""
+        return Watcher(self, (self.lexicon_path, self.templates_path), interval).start()
+
+    def cache_info(self) -> CacheInfo | None:
+        return None if (cache := self.engine.cache) is None else cache.info()
+
+    def shape_info(self) -> ShapeInfo | None:
+        """second_parser 按形状记忆的命中情况"""
+        return None if (shapes := self.engine.shapes) is None else shapes.info()
+
+    def parse(
+        self, text: str, enable_dateutil_trial=False, base: datetime.datetime | None = None
+    ) -> tuple[datetime.datetime, datetime.datetime] | Literal[-1, -2, -3, -4] | None:
+        return self._parse(text, self.engine, enable_dateutil_trial, base).value
+
+    def parse_result(self, text: str, base: datetime.datetime | None = None, enable_dateutil_trial=False) -> ParseResult:
+        """和 parse 一样，只是不管成功失败都返回 ParseResult，失败的话带着出错的阶段和词"""
+        return self._parse(text, self.engine, enable_dateutil_trial, base)
+
+    def compile(self, text: str) -> Plan:
+        """分词到 second_parser 先做掉，之后可以对着任意多个基准时间算（Plan.at、Plan.evaluate）"""
+        engine = self.engine
+        stage = "cutword"
         try:
-            return int(cn2an.cn2an(s, mode="smart"))
-        except ValueError:
+            merged = merge_numerals(engine.cutter.cutword(text))
+            stage = "add_tag"
+            tagged, unknown = _tag(merged, engine.lexicon)
+            if unknown is not None:
+                return Plan(text, None, ParseResult.failure(-2, stage, unknown, "不认识的词"), False)
+            stage = "first_parser"
+            structs = first_parser(tagged, engine=engine)
+            stage = "second_parser"
+            structs = second_parser(structs, engine=engine)
+        except Exception as e:
+            return Plan(text, None, _failure(e, stage, text), False)
+        return Plan(text, structs, None, depends_on_base(structs))
+
+    def parse_many(
+        self, texts: Iterable[str], base: datetime.datetime | None = None, enable_dateutil_trial=False
+    ) -> list[tuple[datetime.datetime, datetime.datetime] | Literal[-1, -2, -3, -4] | None]:
+        """批量解析，结果和 texts 一一对应；相同的文本只算一次，整批共用一个基准时间，某一条失败不影响别的"""
+        # 批量省的是去重和整批共用的 Datum；不同的文本还是各走各的 _parse。分词、合并数字、打标签是逐词的 Python 查表
+        # （cutword 也只有一条一条的接口），跨文本拼在一起做没有可省的，只占两成左右的时间，大头在 first_parser/second_parser
+        texts = texts if isinstance(texts, list) else list(texts)
+        engine = self.engine
+        base = base or datetime.datetime.now()
+        datum = Datum(base)
+        results = dict.fromkeys(texts)
+        for text in results:
+            results[text] = self._parse(text, engine, enable_dateutil_trial, base, datum).value
+        return [results[text] for text in texts]
+
+    def parse_column(
+        self, texts: Any, base: datetime.datetime | None = None, enable_dateutil_trial=False
+    ) -> tuple[Any, Any, Any]:
+        """一整列（list、numpy 数组、pandas Series）一起解析，返回 (开始, 结束, 结果码) 三个 numpy 数组，和 Plan.evaluate 的一样：
+        开始、结束是 datetime64[s]，失败的是 NaT；结果码是 int8，成功是 CODE_OK。相同的文本只算一次，整列共用一个基准时间"""
+        return _parse_column(self, texts, base, enable_dateutil_trial)
+
+    def extract(self, text: str, base: datetime.datetime | None = None) -> list[Extracted]:
+        """从一长段文本里找出所有时间表达式，按出现顺序返回下标和解析结果；解析不出来的段直接丢掉"""
+        engine = self.engine
+        base = base or datetime.datetime.now()
+        datum = Datum(base)
+        found = []
+        scanner = engine.scanner
+        probe = None
+        for pieces in scanner.candidates(text):
+            i = 0
+            while i < len(pieces):
+                start = pieces[i][0]
+                end, value, i = self._join(text, pieces, i, engine, base, datum)
+                if value is None or not scanner.looks_like_time(text[start:end]):
+                    continue
+                # 扫出来的段可能多吃了后面的字（“今天天气”的“今天天”）：去掉之后结果不变的，说明解析根本没用上，段就到前面为止。
+                # 只在一个基准时间下比会撞上巧合（中午的“6小时前”和“6小时”都是 6 点），所以换一个基准时间再比一次
+                for shorter in scanner.shorter_ends(text, start, end):
+                    if self._value(text[start:shorter], engine, base, datum) != value:
+                        break
+                    probe = probe or _probe_base(base)
+                    moved = self._value(text[start:end], engine, probe)
+                    if moved is None or self._value(text[start:shorter], engine, probe) != moved:
+                        break
+                    end = shorter
+                found.append(Extracted(start, end, text[start:end], value))
+        return found
+
+    def _join(
+        self, text: str, pieces: list[tuple[int, int]], i: int, engine: Engine, base: datetime.datetime, datum: Datum
+    ) -> tuple[int, tuple[datetime.datetime, datetime.datetime] | None, int]:
+        """从第 i 段开始，后面空格隔开的段哪些和它是同一个表达式：返回 (结尾, 结果, 下一个表达式从第几段开始)。
+        接上下一段以后结果变细了（日期后面跟着钟点）就是同一个，一样粗的（“明天 后天”、两个日期）是下一个表达式；
+        接上以后结果没变的（PM、一截数字）先记着，后面真变细了才算数"""
+        start, end = pieces[i]
+        value = self._value(text[start:end], engine, base, datum)
+        until = i + 1
+        for j in range(i + 1, len(pieces)):
+            if pieces[j][1] - start > MAX_SPAN:
+                break
+            joined = self._value(text[start : pieces[j][1]], engine, base, datum)
+            if joined is None:
+                if value is None:
+                    continue
+                break
+            if value is None:
+                if self._value(text[slice(*pieces[j])], engine, base, datum) == joined:
+                    return end, None, j  # 前面那几段没起作用，从这一段重新来
+            elif joined == value:
+                continue
+            elif joined[1] - joined[0] >= value[1] - value[0]:
+                break
+            end, value, until = pieces[j][1], joined, j + 1
+        return end, value, until
+
+    def _value(
+        self, text: str, engine: Engine, base: datetime.datetime, datum: Datum | None = None
+    ) -> tuple[datetime.datetime, datetime.datetime] | None:
+        """解析成功而且真认出了点什么的话返回 (开始, 结束)"""
+        result = self._parse(text, engine, False, base, datum)
+        if not result.ok or (value := (result.start, result.end)) == _NOTHING:
             return None
+        return value  # type: ignore[return-value]
+
+    def _parse(
+        self,
+        text: str,
+        engine: Engine,
+        enable_dateutil_trial: bool,
+        base: datetime.datetime | None,
+        datum: Datum | None = None,
+    ) -> ParseResult:
+        if enable_dateutil_trial:
+            with contextlib.suppress(dateutil.parser.ParserError, OverflowError, AssertionError):
+                du = dateutil.parser.parse(text, ignoretz=True, fuzzy=True)
+                assert isinstance(du, datetime.datetime)
+                return ParseResult(du, du)
+        # 埋点没开的时候 trace 是 None，下面每个阶段只多一次判断
+        trace = probe.start(text) if (probe := self.instrumentation) is not None else None
+        cache = engine.cache
+        structs = cache.get(text) if cache is not None else None
+        if structs is not None and not isinstance(structs, list):
+            if trace is not None:
+                trace.cache = "hit"
+                probe.record(trace.finish(structs))
+            return structs  # 和基准时间无关的结果（包括出错），直接用
+        relative = structs is not None
+        if trace is not None and cache is not None:
+            trace.cache = "relative" if relative else "miss"
+        stage = "cutword"
+        result = None
+        try:
+            if structs is None:
+                words = engine.cutter.cutword(text)
+                if trace is not None:
+                    trace.lap(stage)
+                stage = "run_merge_num"
+                merged = merge_numerals(words)
+                if trace is not None:
+                    trace.tokens = len(merged)
+                    trace.lap(stage)
+                stage = "add_tag"
+                tagged, unknown = _tag(merged, engine.lexicon)
+                if trace is not None:
+                    trace.lap(stage)
+                if unknown is not None:
+                    # 有不认识的词就不用往下走了，也不用抛 NameError
+                    result = ParseResult.failure(-2, stage, unknown, "不认识的词")
+                else:
+                    stage = "first_parser"
+                    structs = first_parser(tagged, engine=engine)
+                    if trace is not None:
+                        trace.lap(stage)
+                    stage = "second_parser"
+                    structs = second_parser(structs, engine=engine, trace=trace)
+                    if trace is not None:
+                        trace.lap(stage)
+                    if cache is not None and (relative := depends_on_base(structs)):
+                        cache.put(text, structs)
+            if result is None:
+                if relative:
+                    structs = [struct.copy() for struct in structs]  # third_parser 会改 val，缓存里那份不能动
+                base = base or datetime.datetime.now()
+                if trace is not None:
+                    trace.mark()
+                stage = "third_parser"
+                merged_structs = third_parser(structs, datum or base, trace=trace)
+                if trace is not None:
+                    trace.lap(stage)
+                stage = "to_datetime"
+                start, end = to_datetime(*merged_structs, now=base)
+                if trace is not None:
+                    trace.lap(stage)
+                result = ParseResult(start, end)
+        except Exception as e:
+            result = _failure(e, stage, text)
+        if trace is not None:
+            probe.record(trace.finish(result))
+        if cache is not None and not relative and result.code != UNEXPECTED_ERROR:
+            cache.put(text, result)  # 没预料到的异常不缓存，下次还能再打一次日志
+        return result
+
+
+default_parser = Parser()
+_NOTHING = (datetime.datetime.min, datetime.datetime.min)  # 一个时间词都没认出来（“以后”“农历”这种）的时候 to_datetime 给的
+
+
+def __getattr__(name: str):
+    # 兼容以前的模块级全局变量，访问的时候才加载
+    if name in ("lexicon", "templates", "keywords", "cutter"):
+        return getattr(default_parser.engine, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_ERROR_CODES: tuple[tuple[type[Exception], Literal[-1, -2, -3, -4]], ...] = (
+    (ValueError, -1),
+    (NameError, -2),
+    (OverflowError, -3),
+    (ImportError, -4),
+)
+
+
+def error_code(e: Exception) -> Literal[-1, -2, -3, -4] | None:
+    for kind, code in _ERROR_CODES:
+        if isinstance(e, kind):
+            return code
+    return None
+
+
+UNEXPECTED_ERROR = 0  # 对外输出（命令行、HTTP）的时候，意料之外的异常（返回 None）记成这个
+NOTHING_FOUND = -5  # 对外输出的时候，啥也没认出来的 _NOTHING 记成这个，不能报成 0001-01-01
+
+
+def result_record(result: tuple[datetime.datetime, datetime.datetime] | int | None) -> dict:
+    """解析结果 -> {"start", "end", "error"}，给 JSON/CSV 输出用"""
+    if result == _NOTHING:
+        return {"start": None, "end": None, "error": NOTHING_FOUND}
+    if isinstance(result, tuple):
+        return {"start": result[0].isoformat(), "end": result[1].isoformat(), "error": None}
+    return {"start": None, "end": None, "error": UNEXPECTED_ERROR if result is None else result}
+
+
+def _failure(e: Exception, stage: str, text: str) -> ParseResult:
+    # 在 except 里调
+    if (code := error_code(e)) is None:
+        logger.exception("解析 %r 的时候 %s 出错了", text, stage)
+        code = UNEXPECTED_ERROR
+    return ParseResult.failure(code, stage, message=str(e))
+
+
+_PROBE_SHIFT = datetime.timedelta(days=37, hours=7, minutes=13, seconds=17)  # 年月日时分秒都错开
+
+
+def _probe_base(base: datetime.datetime) -> datetime.datetime:
+    return base - _PROBE_SHIFT if base - datetime.datetime.min > _PROBE_SHIFT else base + _PROBE_SHIFT
+
+
+def to_num(s: str) -> int | None:
+    return parse_numeral(s)
 
 
 def run_merge_num(cut: list[str]) -> list[str]:
-    result = []
-    last_is_num = False
-    for word in cut:
-        if to_num(word) is None:
-            last_is_num = False
-            result.append(word)
-        elif last_is_num:
-            result[-1] += word
-        else:
-            last_is_num = True
-            result.append(word)
+    return [word for word, _ in merge_numerals(cut)]
+
+
+def add_tag(seq: list[str], engine: Engine | None = None) -> list[tuple[dict, int | str, str | None]]:
+    return tag_numerals([(word, parse_numeral(word)) for word in seq], engine=engine)
+
+
+def tag_numerals(seq: list[tuple[str, int | None]], engine: Engine | None = None) -> list[tuple[dict, int | str, str | None]]:
+    # 和 add_tag 一样，只是数值已经在 merge_numerals 里算好了
+    result, unknown = _tag(seq, (engine or default_parser.engine).lexicon)
+    if unknown is not None:
+        raise NameError(f"Unknown word: {unknown}")
     return result
 
 
-def add_tag(seq: list[str]) -> list[tuple[dict, int | str, str | None]]:
+def _tag(seq: list[tuple[str, int | None]], lexicon: dict) -> tuple[list[tuple[dict, int | str, str | None]], str | None]:
+    """碰到不认识的词就停，连同那个词一起返回（_parse 用，不抛异常）"""
     result = []
-    for word in seq:
+    for word, num in seq:
         if word in lexicon:
             if lexicon[word] is not None:
                 result.append((lexicon[word], word, None))
             continue
-        num = to_num(word)
         if num is None:
-            raise NameError(f"Unknown word: {word}")
+            return result, word
         result.append((lexicon.get("_NUM"), num, word))
-    return result
+    return result, None
 
 
-def first_parser(tagged: list[tuple[dict, int | str, str | None]]) -> list[Struct]:
+def first_parser(tagged: list[tuple[dict, int | str, str | None]], engine: Engine | None = None) -> list[Struct]:
+    prototypes = (engine or default_parser.engine).prototypes
     structs: list[Struct] = []
     this = Struct()
     for tag, value, raw in tagged:
@@ -80,20 +472,24 @@ def first_parser(tagged: list[tuple[dict, int | str, str | None]]) -> list[Struc
             for expand_struct in expand_structs:
                 if this.body is not None or this.meta is not None or this.datum is not None:
                     structs.append(this)
-                this = Struct(expand_struct)
+                proto = prototypes.get(id(expand_struct))
+                this = proto.make() if proto is not None else Struct(expand_struct)
             continue
         try:
             this.add(**as_word, value=value, raw=raw)
         except AttributeError:
             if this.body is not None or this.meta is not None or this.datum is not None:
                 structs.append(this)
-            this = Struct(as_word, value=value, raw=raw)
+            proto = prototypes.get(id(as_word))
+            this = proto.make(value, raw) if proto is not None else Struct(as_word, value=value, raw=raw)
     if this.body is not None or this.meta is not None:
         structs.append(this)
     return structs
 
 
-def second_parser(structs: list[Struct | Any]) -> list[Struct]:
+def second_parser(structs: list[Struct | Any], engine: Engine | None = None, trace: Trace | None = None) -> list[Struct]:
+    engine = engine or default_parser.engine
+    lexicon = engine.lexicon
     for struct in structs:
         struct.reset_stop()
     for struct in structs:
@@ -103,50 +499,68 @@ def second_parser(structs: list[Struct | Any]) -> list[Struct]:
             if entry and "AS_STRUCT" in entry:
                 as_struct = entry["AS_STRUCT"]
                 struct.add(**as_struct)
+    index = engine.index
+    key = None
+    if (shapes := engine.shapes) is not None:
+        key, replay = shapes.lookup(structs)
+        if replay is not None:
+            # 同形状的之前完整匹配过，照着记下来的顺序执行 THEN 就行
+            templates = index.templates
+            for t_index, start_idx, idx_offset in replay:
+                for i, action in enumerate(templates[t_index].actions):
+                    idx_offset = action(structs, start_idx, i, idx_offset)
+            if trace is not None:
+                trace.matches += len(replay)
+            return structs
+    applied = []
+    # 每个位置上可能匹配的（模板编号, 第几个WHEN）；结构体被模板改过之后要重新算
+    cands = [index.candidates(struct_key(struct)) for struct in structs]
+    present = frozenset().union(*cands)
+    tried = skipped = matched = 0
     stopped_templates = []
-    for name, template in templates.items():
-        if name in stopped_templates:
+    for t_index, template in enumerate(index.templates):
+        if template.name in stopped_templates:
+            continue
+        match_len = template.size
+        if any((t_index, i) not in present for i in range(match_len)):
+            skipped += max(len(structs) - match_len + 1, 0)
             continue
-        when_list = template.get("WHEN", [])
-        then_list = template.get("THEN", [])
-        stop_list = template.get("STOP", [])
-        match_len = len(when_list)
-        assert len(then_list) == match_len
         idx_offset = 0
         for start_idx in range(len(structs) - match_len + 1):
-            for i in range(match_len):
-                condition = when_list[i]
-                if not structs[start_idx + i + idx_offset].check(**condition.get("STRUCT") or {}):
+            if not all((t_index, i) in cands[start_idx + i + idx_offset] for i in range(match_len)):
+                skipped += 1
+                continue
+            tried += 1
+            # 埋点没开的时候用不计数的版本，RAW 检查不碰 raw_counter
+            for i, check in enumerate(template.checks if trace is None else template.traced_checks()):
+                if not check(structs[start_idx + i + idx_offset]):
                     break
             else:
-                stopped_templates.extend(stop_list)
-                for i in range(match_len):
-                    rule = then_list[i]
-                    if (struct_expanded := rule.get("EXPAND")) is not None:
-                        structs_expanded = [expanding.get("STRUCT", {}) for expanding in struct_expanded]
-                        if not structs_expanded:
-                            structs[start_idx + i + idx_offset] = None
-                            idx_offset -= 1
-                        elif len(structs_expanded) == 1:
-                            structs[start_idx + i + idx_offset].add(**structs_expanded[0])
-                        else:
-                            struct_pack = [structs[start_idx + i]] + [Struct()] * (len(structs_expanded) - 1)
-                            for pack_item in struct_pack:
-                                pack_item.add(**structs_expanded.pop(0))
-                            structs[start_idx + i + idx_offset : start_idx + i + idx_offset + 1] = struct_pack
-                            idx_offset += len(struct_pack) - 1
-                        continue
-                    if struct_rule := rule.get("STRUCT"):
-                        structs[start_idx + i + idx_offset].add(**struct_rule)
+                matched += 1
+                applied.append((t_index, start_idx, idx_offset))
+                stopped_templates.extend(template.stop)
+                for i, action in enumerate(template.actions):
+                    idx_offset = action(structs, start_idx, i, idx_offset)
+                cands = [index.candidates(struct_key(struct)) for struct in structs]
+                present = frozenset().union(*cands)
+    index.tried += tried
+    index.skipped += skipped
+    if key is not None:
+        shapes.record(key, tuple(applied))  # type: ignore
+    if trace is not None:
+        trace.attempts += tried
+        trace.matches += matched
     return structs
 
 
 def third_parser(
-    structs: list[Struct], base: datetime.datetime | None = None, instant_merge: bool = False
-) -> tuple[list[Struct], relativedelta | None]:
-    datum = Datum(base or datetime.datetime.now())
+    structs: list[Struct], base: datetime.datetime | Datum | None = None, instant_merge: bool = False, trace: Trace | None = None
+) -> tuple[list[Struct], relativedelta | datetime.timedelta | None]:
+    # base 可以直接给一个算好的 Datum（批量解析的时候整批共用一个），这里会改它，所以拷一份
+    datum = base.copy() if isinstance(base, Datum) else Datum(base or datetime.datetime.now())
     field_map = {"CE": "CE", "YR": "years", "MO": "months", "WK": "WK", "DA": "days", "HR": "hours", "MI": "minutes", "SC": "seconds"}
     mod_fields = defaultdict(int)
+    evals = 0
     for struct in structs:
         if struct.datum is not None:
             datum.update(struct.datum)
@@ -163,17 +577,9 @@ def third_parser(
         tmp_val = val
         for mod in struct.body.mod:
             if isinstance(mod, str):
-                tmp_val = eval(
-                    mod,
-                    {
-                        "val": tmp_val,
-                        "datum": datum_this,
-                        "Cdatum": datum,
-                        "datetime": datetime,
-                        "math": math,
-                        "struct": struct,
-                    },
-                )
+                if (func := compile_mod(mod)) is not None:
+                    tmp_val = func(tmp_val, datum_this, datum, struct)
+                    evals += 1
             else:
                 tmp_val += mod
         if not instant_merge and struct.meta is not None and struct.meta.ID is not None:
@@ -188,31 +594,41 @@ def third_parser(
     if "CE" in mod_fields:
         mod_fields["years"] = mod_fields.get("years", 0) + mod_fields["CE"] * 100
         del mod_fields["CE"]
-    modifier = None if instant_merge else relativedelta(**mod_fields)  # type: ignore
+    modifier: relativedelta | datetime.timedelta | None = None
+    if instant_merge:
+        pass
+    elif "years" in mod_fields or "months" in mod_fields:
+        modifier = relativedelta(**mod_fields)  # type: ignore
+    else:
+        modifier = datetime.timedelta(**mod_fields)  # 只偏移日、时、分、秒的话用不着 relativedelta
+    if trace is not None:
+        trace.mod_evals += evals
     return structs, modifier
 
 
-def to_datetime(
-    structs: list[Struct], modifier: relativedelta | None = None, now: datetime.datetime | None = None
-) -> tuple[datetime.datetime, datetime.datetime]:
-    field_map: dict[str, Literal["CE", "years", "months", "WK", "days", "hours", "minutes", "seconds"]] = {
-        "CE": "CE",
-        "YR": "years",
-        "MO": "months",
-        "WK": "WK",
-        "DA": "days",
-        "HR": "hours",
-        "MI": "minutes",
-        "SC": "seconds",
-    }
-    perc_level = {"CE": 0, "YR": 1, "MO": 2, "WK": 3, "DA": 4, "HR": 5, "MI": 6, "SC": 7}
+_FIELD_MAP: dict[str, Literal["CE", "years", "months", "WK", "days", "hours", "minutes", "seconds"]] = {
+    "CE": "CE",
+    "YR": "years",
+    "MO": "months",
+    "WK": "WK",
+    "DA": "days",
+    "HR": "hours",
+    "MI": "minutes",
+    "SC": "seconds",
+}
+_PERC_LEVEL = {"CE": 0, "YR": 1, "MO": 2, "WK": 3, "DA": 4, "HR": 5, "MI": 6, "SC": 7}
+
+
+def _fields_and_step(
+    structs: list[Struct],
+) -> tuple[dict[Literal["CE", "years", "months", "WK", "days", "hours", "minutes", "seconds"], int], tuple[str, Any]]:
     # 别问为什么这有一大坨Literal，问就是不写的话类型检查不给过
     fields: dict[Literal["CE", "years", "months", "WK", "days", "hours", "minutes", "seconds"], int] = {
-        field_map[struct.meta.ID]: struct.body.val
+        _FIELD_MAP[struct.meta.ID]: struct.body.val
         for struct in structs
         if struct.meta is not None
         and struct.meta.ID is not None
-        and struct.meta.ID in field_map
+        and struct.meta.ID in _FIELD_MAP
         and struct.body is not None
         and struct.body.val is not None
     }
@@ -220,10 +636,68 @@ def to_datetime(
     for struct in structs:
         if struct.meta is None or struct.meta.step is None or struct.meta.step.amp is None or struct.meta.step.perc is None:
             continue
-        if perc_level.get(struct.meta.step.perc, 0) > perc_level[step[0]] or (
-            perc_level.get(struct.meta.step.perc, 0) == perc_level[step[0]] and struct.meta.step.amp < step[1]
+        if _PERC_LEVEL.get(struct.meta.step.perc, 0) > _PERC_LEVEL[step[0]] or (
+            _PERC_LEVEL.get(struct.meta.step.perc, 0) == _PERC_LEVEL[step[0]] and struct.meta.step.amp < step[1]
         ):
             step = (struct.meta.step.perc, struct.meta.step.amp)
+    return fields, step
+
+
+def depends_on_base(structs: list[Struct]) -> bool:
+    """second_parser 之后的结构体，算出来的结果会不会随基准时间变"""
+    for struct in structs:
+        body = struct.body
+        if body is None or body.mod is None:
+            continue
+        if body.val is None and struct.meta is not None and struct.meta.ID is not None:
+            return True  # 没有值，third_parser 会拿基准时间的对应字段来算
+        if any(isinstance(mod, str) and reads_datum(mod) for mod in body.mod):
+            return True
+    fields, step = _fields_and_step(structs)
+    # 年月日缺了，比精度高的拿当前时间补（“8月15日”的年份），比精度低的补 1
+    return any(_FIELD_MAP[must] not in fields and _PERC_LEVEL[must] < _PERC_LEVEL[step[0]] for must in ("YR", "MO", "DA"))
+
+
+def _from_lunar(year: int, month: int, day: int, leap: bool) -> datetime.date:
+    """农历年月日换成公历"""
+    if lunar_covers(year):
+        return lunar_to_solar(year, month, day, leap)
+    # 表里没有的年份才找 lunarcalendar
+    try:
+        from lunarcalendar import Converter, DateNotExist, Lunar
+    except ImportError:
+        raise ImportError("lunarcalendar模块未安装，无法处理农历时间")
+
+    try:
+        solar = Converter.Lunar2Solar(Lunar(year=year, month=month, day=day, isleap=leap))
+        return datetime.date(solar.year, solar.month, solar.day)
+    except (DateNotExist, IndexError) as e:
+        raise ValueError("无效的农历时间") from e
+
+
+_MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+_LAST_SECOND = datetime.datetime(9999, 12, 31, 23, 59, 59)
+
+
+def _days_in_month(year: int, month: int) -> int:
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _MONTH_DAYS[month - 1]
+
+
+def _add_months(dt: datetime.datetime, months: int) -> datetime.datetime:
+    """和 dt + relativedelta(months=months) 一样：那个月没有这一天就取月底"""
+    year, month = divmod(dt.month - 1 + months, 12)
+    year += dt.year
+    return dt.replace(year=year, month=month + 1, day=min(dt.day, _days_in_month(year, month + 1)))
+
+
+def to_datetime(
+    structs: list[Struct], modifier: relativedelta | datetime.timedelta | None = None, now: datetime.datetime | None = None
+) -> tuple[datetime.datetime, datetime.datetime]:
+    field_map = _FIELD_MAP
+    perc_level = _PERC_LEVEL
+    fields, step = _fields_and_step(structs)
     now = now or datetime.datetime.now()
     for must in ("YR", "MO", "DA"):
         if field_map[must] not in fields:
@@ -232,53 +706,90 @@ def to_datetime(
     if "CE" in fields:
         fields["years"] = fields.get("years", 0) + fields["CE"] * 100
         del fields["CE"]
-    if "WK" in fields:
+    weeks = "WK" in fields
+    if weeks:
         fields["days"] = fields["WK"] * 7
         del fields["WK"]
     if step[0] == "CE":
         step = ("years", step[1] * 100)
     elif step[0] == "WK":
         step = ("days", step[1])  # 不乘7
-    dt = datetime.datetime(1,1,1,0,0,0,0) + relativedelta(**fields) - relativedelta(years=1,months=1,days=1)
-    if modifier is not None:
-        dt += modifier
+    year, month, day = fields["years"], fields["months"], fields["days"]
+    clock = datetime.timedelta(hours=fields.get("hours", 0), minutes=fields.get("minutes", 0), seconds=fields.get("seconds", 0))  # 25点、60分钟照样往前进位
 
     if any(struct.datum and struct.datum.lunar for struct in structs):
-        try:
-            from lunarcalendar import Converter, DateNotExist, Lunar
-        except ImportError:
-            raise ImportError("lunarcalendar模块未安装，无法处理农历时间")
-
-        try:
-            solar = Converter.Lunar2Solar(Lunar(year=dt.year, month=abs(dt.month), day=dt.day, isleap=dt.month < 0))  # 负数表示闰月
-            dt = datetime.datetime(solar.year, solar.month, solar.day, dt.hour, dt.minute, dt.second)
-        except DateNotExist as e:
-            raise ValueError("无效的农历时间") from e
+        # 年、月的偏移（明年、下个月）按农历的年月算，日和时分秒的偏移换成公历以后再加
+        if isinstance(modifier, relativedelta) and (modifier.years or modifier.months):
+            year, month = divmod(year * 12 + month - 1 + modifier.years * 12 + modifier.months, 12)
+            month += 1
+            modifier = modifier + relativedelta(years=-modifier.years, months=-modifier.months)
+        solar = _from_lunar(year, month, day, any(struct.datum and struct.datum.leap for struct in structs))
+        dt = datetime.datetime(solar.year, solar.month, solar.day) + clock
+    else:
+        # 以前是 datetime(1,1,1) + relativedelta(**fields) - relativedelta(years=1,months=1,days=1)，
+        # 又慢又会在月底出错（1月31日算成2月3日），13月、2月30日也不报错；现在直接按年月日建，
+        # 星期折出来的日子（周数×7）、带偏移的日子（40天后）可以超过一个月的天数，往后进位；只有写死的几号才要在这个月里
+        if not 1 <= month <= 12:
+            raise ValueError(f"month {month} is out of range")
+        relative = weeks or any(
+            struct.meta is not None and struct.meta.ID == "DA" and struct.body is not None and struct.body.mod for struct in structs
+        )
+        if not relative and not 1 <= day <= _days_in_month(year, month):
+            raise ValueError(f"day {day} is out of range for {year}-{month}")
+        dt = datetime.datetime(year, month, 1) + datetime.timedelta(days=day - 1) + clock
+    if modifier is not None:
+        dt += modifier  # 只有带年、月偏移的才是 relativedelta，见 third_parser
 
+    unit, amp = step[0], int(step[1])
     try:
-        rel_delta = relativedelta(**{step[0]: int(step[1])})  # type: ignore
-        edt = dt - relativedelta(seconds=1) + rel_delta
-    except OverflowError:
-        edt = dt
+        if unit == "years":
+            edt = _add_months(dt, amp * 12)
+        elif unit == "months":
+            edt = _add_months(dt, amp)
+        else:
+            edt = dt + datetime.timedelta(**{unit: amp})
+        edt -= datetime.timedelta(seconds=1)
+    except (OverflowError, ValueError):
+        edt = _LAST_SECOND if amp > 0 else dt  # 到 9999 年底就封顶了
     return (dt, edt)
 
 
-def full_parse(text: str, enable_dateutil_trial=False) -> tuple[datetime.datetime, datetime.datetime] | Literal[-1, -2, -3, -4] | None:
-    if enable_dateutil_trial:
-        with contextlib.suppress(dateutil.parser.ParserError, OverflowError, AssertionError):
-            du = dateutil.parser.parse(text, ignoretz=True, fuzzy=True)
-            assert isinstance(du, datetime.datetime)
-            return (du, du)
-    try:
-        return to_datetime(*third_parser(second_parser(first_parser(add_tag(run_merge_num(cutter.cutword(text)))))))
-    except ValueError:
-        return -1
-    except NameError:
-        return -2
-    except OverflowError:
-        return -3
-    except ImportError:
-        return -4
-    except Exception:
-        traceback.print_exc()
-        return None
+def full_parse(
+    text: str, enable_dateutil_trial=False, base: datetime.datetime | None = None
+) -> tuple[datetime.datetime, datetime.datetime] | Literal[-1, -2, -3, -4] | None:
+    return default_parser.parse(text, enable_dateutil_trial, base)
+
+
+def parse_result(text: str, base: datetime.datetime | None = None, enable_dateutil_trial=False) -> ParseResult:
+    return default_parser.parse_result(text, base, enable_dateutil_trial)
+
+
+def reload() -> Engine:
+    return default_parser.reload()
+
+
+def preload(parser: Parser | None = None) -> Parser:
+    """先在主进程里加载好、再 fork 出 worker 的部署（gunicorn 的 preload_app = True、自己 os.fork 的）在 fork 之前调一次：
+    词库、模板、分词器只加载这一份，worker 按页共享；顺便 gc.freeze()，免得 worker 里的 GC 去改这些对象、把页面复制走。
+    spawn、forkserver 起的 worker 不继承主进程的内存，调了也没用"""
+    parser = (parser or default_parser).warm()
+    gc.freeze()
+    return parser
+
+
+def compile_plan(text: str) -> Plan:
+    return default_parser.compile(text)
+
+
+def parse_many(
+    texts: Iterable[str], base: datetime.datetime | None = None, enable_dateutil_trial=False
+) -> list[tuple[datetime.datetime, datetime.datetime] | Literal[-1, -2, -3, -4] | None]:
+    return default_parser.parse_many(texts, base, enable_dateutil_trial)
+
+
+def parse_column(texts: Any, base: datetime.datetime | None = None, enable_dateutil_trial=False) -> tuple[Any, Any, Any]:
+    return default_parser.parse_column(texts, base, enable_dateutil_trial)
+
+
+def extract(text: str, base: datetime.datetime | None = None) -> list[Extracted]:
+    return default_parser.extract(text, base)
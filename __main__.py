@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import argparse
+import collections
+import csv
+import datetime
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from typing import IO, Any
+
+from . import Parser, result_record
+
+# python -m cn2t [文件...]：一行一条（或者 CSV/JSONL 里的某一列），结果按 JSONL/CSV 写出去。
+# 整条流水线都是生成器，一次只在内存里放一批，几个 G 的文件也不怕
+
+FIELDS = ("text", "start", "end", "error")
+BAD_ROW = -6  # 读不出来的行（坏掉的 JSON、不是对象、少了那一列）：输出里照样占一行，错误码记成这个
+
+
+class InputError(Exception):
+    """输入文件整个不对（比如根本没有 --column 指的那一列），直接退出"""
+
+
+class _BadRow(str):
+    # 坏行原样带着走，不拿去解析
+    pass
+
+
+def _open(path: str, newline: str | None = None) -> IO[str]:
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", errors="replace", newline=newline)
+    return open(path, encoding="utf-8", errors="replace", newline=newline)
+
+
+def _guess_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    return {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(ext, "text")
+
+
+def read_texts(paths: list[str], fmt: str | None, column: str) -> Iterator[str]:
+    for path in paths:
+        kind = fmt or _guess_format(path)
+        with _open(path, newline="" if kind == "csv" else None) as f:
+            if kind == "csv":
+                reader = csv.DictReader(f)
+                if reader.fieldnames is not None and column not in reader.fieldnames:
+                    raise InputError(f"{path}: 没有 {column!r} 这一列，有的是 {', '.join(reader.fieldnames)}")
+                for row in reader:
+                    yield row.get(column) or ""
+            elif kind == "jsonl":
+                first = True
+                for number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        row = json.loads(line)
+                        value = row[column]
+                    except (ValueError, TypeError, KeyError) as e:
+                        # 第一条就没有这一列，多半是 --column 写错了；后面的坏行（烂 JSON、不是对象）输出一条错误，不能让一条烂数据把整个文件停掉
+                        if first and isinstance(e, KeyError):
+                            raise InputError(f"{path}:{number}: 没有 {column!r} 这一列，有的是 {', '.join(row)}") from None
+                        print(f"{path}:{number}: 不是带 {column!r} 的 JSON 对象", file=sys.stderr)
+                        yield _BadRow(line.rstrip("\r\n"))
+                        continue
+                    finally:
+                        first = False
+                    yield "" if value is None else str(value)
+            else:
+                for line in f:
+                    yield line.rstrip("\r\n")
+
+
+def _batched(texts: Iterable[str], size: int) -> Iterator[list[str]]:
+    source = iter(texts)
+    while chunk := list(itertools.islice(source, size)):
+        yield chunk
+
+
+def parse_stream(
+    texts: Iterable[str], base: datetime.datetime, processes: int, batch_size: int, tokenizer: str = "cutword"
+) -> Iterator[tuple[str, object]]:
+    if processes > 1:
+        from .parallel import ParallelParser
+
+        with ParallelParser(processes, tokenizer=tokenizer) as parser:
+            texts, copy = itertools.tee(texts)  # tee 只缓存还在路上的那几块
+            results = parser.map((text for text in texts if not isinstance(text, _BadRow)), base)
+            for text in copy:
+                yield text, BAD_ROW if isinstance(text, _BadRow) else next(results)
+        return
+    parser = Parser(tokenizer=tokenizer).warm()
+    for chunk in _batched(texts, batch_size):
+        results = iter(parser.parse_many([text for text in chunk if not isinstance(text, _BadRow)], base))
+        for text in chunk:
+            yield text, BAD_ROW if isinstance(text, _BadRow) else next(results)
+
+
+def record(text: str, result: Any) -> dict:
+    return {"text": text, **result_record(result)}
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m cn2t", description="批量解析中文时间表达式")
+    ap.add_argument("inputs", nargs="*", default=["-"], help="输入文件，- 或者不写表示 stdin")
+    ap.add_argument("-f", "--format", choices=("text", "csv", "jsonl"), help="输入格式，默认按扩展名猜，猜不出来就当一行一条")
+    ap.add_argument("-c", "--column", default="text", help="CSV/JSONL 里要解析的列（默认 text）")
+    ap.add_argument("-o", "--output", default="-", help="输出文件，默认 stdout")
+    ap.add_argument("-t", "--to", choices=("jsonl", "csv"), default="jsonl", help="输出格式（默认 jsonl）")
+    ap.add_argument("-b", "--base", type=datetime.datetime.fromisoformat, help="基准时间（ISO 格式），不写就是启动的时候的当前时间")
+    ap.add_argument("-j", "--processes", type=int, default=1, help="开几个进程并行解析（默认 1，不开）")
+    ap.add_argument("--batch-size", type=int, default=1024, help="单进程时每批多少条（默认 1024）")
+    ap.add_argument("--tokenizer", choices=("cutword", "trie"), default="cutword", help="分词器（默认 cutword；trie 启动快、不用装 cutword）")
+    args = ap.parse_args(argv)
+
+    base = args.base or datetime.datetime.now()  # 整个文件共用一个基准时间
+    if args.output == "-":
+        sys.stdout.reconfigure(encoding="utf-8")  # type: ignore
+        out = sys.stdout
+    else:
+        out = open(args.output, "w", encoding="utf-8", newline="")
+    writer = csv.writer(out) if args.to == "csv" else None
+    if writer is not None:
+        writer.writerow(FIELDS)
+    errors: collections.Counter[int] = collections.Counter()
+    count = status = 0
+    start = time.perf_counter()
+    try:
+        for text, result in parse_stream(read_texts(args.inputs, args.format, args.column), base, args.processes, args.batch_size, args.tokenizer):
+            row = record(text, result)
+            if row["error"] is not None:
+                errors[row["error"]] += 1
+            if writer is not None:
+                writer.writerow(["" if row[field] is None else row[field] for field in FIELDS])
+            else:
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+        out.flush()
+    except BrokenPipeError:
+        # 下游（比如 head）不要了：把 stdout 指到 /dev/null，免得退出的时候 flush 再报一次错
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except KeyboardInterrupt:
+        status = 130
+    except InputError as e:
+        print(e, file=sys.stderr)
+        status = 2
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    summary = ", ".join(f"{code}: {n}" for code, n in sorted(errors.items())) or "none"
+    print(f"{count} lines in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f} lines/s), errors: {summary}", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
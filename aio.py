@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any
+
+from . import Parser, default_parser
+from .parallel import ParallelParser
+
+# asyncio 版本。直接在协程里调 full_parse 会把事件循环卡住（正常几百微秒，怪输入更久），
+# 所以这里把一小段时间窗口内到的请求攒成一批，丢到执行器里走 parse_many，事件循环只负责收发
+
+_DEFAULT: Any = object()
+
+
+class AsyncParser:
+    # parser 可以是 Parser（在线程里跑，默认单独开一个线程）或者 ParallelParser（在进程池里跑，不跟事件循环抢 GIL）
+    def __init__(
+        self,
+        parser: Parser | ParallelParser | None = None,
+        *,
+        executor: Executor | None = None,
+        window: float = 0.001,
+        max_batch: int = 256,
+        max_concurrency: int = 1024,
+        timeout: float | None = None,
+    ):
+        self.parser = parser or default_parser
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._own_executor = executor is None and not isinstance(self.parser, ParallelParser)
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="cn2t") if self._own_executor else executor
+        self._semaphore = asyncio.Semaphore(max_concurrency)  # 同时在等结果的调用数上限，多出来的排队
+        self._pending: list[tuple[str, datetime.datetime | None, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()
+
+    async def parse(self, text: str, base: datetime.datetime | None = None, timeout: float | None = _DEFAULT):
+        """和 full_parse 一样的返回值；超时抛 TimeoutError（排队的时间也算）"""
+        async with asyncio.timeout(self.timeout if timeout is _DEFAULT else timeout):
+            async with self._semaphore:
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                self._pending.append((text, base, future))
+                if len(self._pending) >= self.max_batch:
+                    self._flush()
+                elif self._flush_handle is None:
+                    self._flush_handle = loop.call_later(self.window, self._flush)
+                return await future
+
+    async def parse_many(self, texts: list[str], base: datetime.datetime | None = None, timeout: float | None = _DEFAULT) -> list:
+        """已经是一批了就不用攒，直接整批跑；整批算一个并发名额"""
+        async with asyncio.timeout(self.timeout if timeout is _DEFAULT else timeout):
+            async with self._semaphore:
+                return await self._submit(texts, base)
+
+    def _submit(self, texts: list[str], base: datetime.datetime | None) -> asyncio.Future:
+        if isinstance(self.parser, ParallelParser):
+            return asyncio.wrap_future(self.parser.submit(texts, base))
+        return asyncio.get_running_loop().run_in_executor(self.executor, self.parser.parse_many, texts, base)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        groups: dict[datetime.datetime | None, list] = {}
+        for item in pending:
+            if not item[2].done():  # 已经超时、被取消的就不算了
+                groups.setdefault(item[1], []).append(item)
+        for base, items in groups.items():
+            task = asyncio.get_running_loop().create_task(self._run(items, base))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, items: list, base: datetime.datetime | None):
+        try:
+            results = await self._submit([text for text, _, _ in items], base)
+        except Exception as e:
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def aclose(self):
+        """把攒着的跑完再关；自己开的线程池顺便关掉，传进来的执行器、ParallelParser 不管"""
+        if self._pending:
+            self._flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._own_executor:
+            self.executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> AsyncParser:
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -0,0 +1,82 @@
+# 高并发下事件循环卡不卡：一边按固定速率发解析请求，一边每 1ms 醒一次看自己迟到了多久
+# python -m cn2t.benchmarks.aio [每秒请求数] [秒数] [怪输入比例]
+# 怪输入是上千字的长文本，单条就要解析好几毫秒，直接在事件循环里算的话整个循环都得等它
+from __future__ import annotations
+
+import asyncio
+import datetime
+import sys
+import time
+
+from cn2t import Parser
+from cn2t.aio import AsyncParser
+from cn2t.benchmarks.corpus import generate
+from cn2t.parallel import ParallelParser
+
+
+def quantiles(values: list[float]) -> str:
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))] * 1e3  # noqa: E731
+    return f"p50 {pick(0.5):6.2f}ms  p99 {pick(0.99):6.2f}ms  max {values[-1] * 1e3:6.2f}ms"
+
+
+async def run(mode: str, parser: Parser, rate: int, seconds: float, texts: list[str]) -> None:
+    base = datetime.datetime(2025, 8, 15, 12)
+    lags: list[float] = []
+    latencies: list[float] = []
+    done = False
+
+    async def ticker():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    async def one(call, text: str):
+        start = time.perf_counter()
+        await call(text)
+        latencies.append(time.perf_counter() - start)
+
+    async def inline(text: str):
+        parser.parse(text, base=base)  # 直接在事件循环里算，什么都不做的写法
+
+    if mode == "inline":
+        call, closer = inline, None
+    elif mode == "thread":
+        closer = AsyncParser(parser)
+        call = lambda text: closer.parse(text, base)  # noqa: E731
+    else:
+        closer = AsyncParser(ParallelParser(2, cache_size=0))
+        await closer.parse("今天", base)  # 等 worker 起来
+        call = lambda text: closer.parse(text, base)  # noqa: E731
+    tick = asyncio.create_task(ticker())
+    tasks = []
+    start = time.perf_counter()
+    for i in range(int(rate * seconds)):
+        # 按速率发请求，落后了就不睡直接发
+        if (delay := start + i / rate - time.perf_counter()) > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(call, texts[i % len(texts)])))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    done = True
+    await tick
+    if closer is not None:
+        await closer.aclose()
+        if isinstance(closer.parser, ParallelParser):
+            closer.parser.close()
+    print(f"{mode}:\t{len(tasks) / elapsed:8.0f} req/s")
+    print(f"\tloop lag  {quantiles(lags)}")
+    print(f"\tlatency   {quantiles(latencies)}")
+
+
+if __name__ == "__main__":
+    rate = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+    odd = float(sys.argv[3]) if len(sys.argv) > 3 else 0.01
+    texts = generate(int(rate * seconds), unique=int(rate * seconds), skew=False)
+    for i in range(0, len(texts), int(1 / odd) if odd else len(texts) + 1):
+        texts[i] = "今天明天" * 300
+    parser = Parser(cache_size=0).warm()  # 不让缓存把活干了
+    for mode in ("inline", "thread", "process"):
+        asyncio.run(run(mode, parser, rate, seconds, texts))
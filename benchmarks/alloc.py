@@ -0,0 +1,57 @@
+# 每次解析的耗时、内存分配峰值，以及 first_parser 建出来的结构体占多大
+# python -m cn2t.benchmarks.alloc [轮数]
+from __future__ import annotations
+
+import datetime
+import sys
+import timeit
+import tracemalloc
+
+from cn2t import Parser, add_tag, first_parser, run_merge_num
+from cn2t.benchmarks.corpus import TESTINGS
+from cn2t.classes import Datum
+
+
+def peak(parser: Parser, text: str) -> int:
+    tracemalloc.start()
+    parser.parse(text)
+    _, result = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result
+
+
+def deep_size(obj, seen: set[int]) -> tuple[int, int]:
+    # (对象个数, 字节数)，只算结构体自己，不算里面引用的 str/int
+    if obj is None or id(obj) in seen or not (isinstance(obj, (list, set)) or type(obj).__module__ == Datum.__module__):
+        return 0, 0
+    seen.add(id(obj))
+    count, size = 1, sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    children = obj if isinstance(obj, (list, set)) else [getattr(obj, name, None) for name in dir(obj) if not name.startswith("__")]
+    for child in children:
+        c, s = deep_size(child, seen)
+        count, size = count + c, size + s
+    return count, size
+
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    parser = Parser(cache_size=0).warm()  # 不开结果缓存，量的是真正跑一遍的开销
+    engine = parser.engine
+    for testing in TESTINGS:
+        parser.parse(testing)  # 预热各种缓存
+    elapsed = timeit.timeit(lambda: [parser.parse(testing) for testing in TESTINGS], number=number)
+    peaks = [peak(parser, testing) for testing in TESTINGS]
+    sizes = []
+    for testing in TESTINGS:
+        try:
+            structs = first_parser(add_tag(run_merge_num(engine.cutter.cutword(testing)), engine=engine))
+        except NameError:
+            continue
+        sizes.append(deep_size(structs, set()))
+    print("测试时间:", datetime.datetime.now())
+    print(f"time:\t\t{elapsed / number / len(TESTINGS) * 1e6:>8.1f}μs/parse")
+    print(f"peak:\t\t{sum(peaks) / len(peaks) / 1024:>8.2f}KiB/parse")
+    print(f"objects:\t{sum(s[0] for s in sizes) / len(sizes):>8.1f}/parse")
+    print(f"struct bytes:\t{sum(s[1] for s in sizes) / len(sizes):>8.0f}B/parse")
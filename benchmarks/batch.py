@@ -0,0 +1,27 @@
+# parse_many 和逐条 full_parse 的吞吐对比，模拟日志里一列时间文本（有重复，越常见的重复越多）
+# python -m cn2t.benchmarks.batch [行数] [不同的文本数]
+from __future__ import annotations
+
+import datetime
+import sys
+import time
+
+from cn2t import Parser
+from cn2t.benchmarks.corpus import generate
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    texts = generate(number, int(sys.argv[2]) if len(sys.argv) > 2 else 5000)
+    base = datetime.datetime(2025, 8, 15, 12)
+    print(f"{number} rows, {len(set(texts))} unique")
+    for cache_size in (0, 1024):
+        parser = Parser(cache_size=cache_size).warm()
+        start = time.perf_counter()
+        looped = [parser.parse(text, base=base) for text in texts]
+        loop = time.perf_counter() - start
+        parser.engine.cache and parser.engine.cache.clear()
+        start = time.perf_counter()
+        batched = parser.parse_many(texts, base=base)
+        batch = time.perf_counter() - start
+        assert looped == batched, "parse_many 和逐条解析结果不一致"
+        print(f"cache_size={cache_size}:\tloop {number / loop:10.0f}/s\tparse_many {number / batch:10.0f}/s\t({loop / batch:.1f}x)")
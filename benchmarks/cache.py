@@ -0,0 +1,28 @@
+# 结果缓存的效果：按齐普夫分布从样例里抽（越靠前的越常见），模拟“今天”“明天下午3点”反复出现的流量
+# python -m cn2t.benchmarks.cache [请求数] [缓存大小]
+from __future__ import annotations
+
+import datetime
+import random
+import sys
+import time
+
+from cn2t import Parser
+from cn2t.benchmarks.corpus import TESTINGS
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    rng = random.Random(0)
+    texts = rng.choices(TESTINGS, weights=[1 / (rank + 1) for rank in range(len(TESTINGS))], k=number)
+    base = datetime.datetime(2025, 8, 15, 12)
+    results = {}
+    for cache_size in (0, size):
+        parser = Parser(cache_size=cache_size).warm()
+        start = time.perf_counter()
+        results[cache_size] = [parser.parse(text, base=base) for text in texts]
+        elapsed = time.perf_counter() - start
+        print(f"cache_size={cache_size}:\t{elapsed / number * 1e6:8.1f}us/parse\t{number / elapsed:10.0f}/s")
+        if (info := parser.cache_info()) is not None:
+            print(f"\thits {info.hits / number:.1%} (relative {info.relative_hits / number:.1%}), evictions {info.evictions}")
+    assert results[0] == results[size], "缓存前后结果不一致"
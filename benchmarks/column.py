@@ -0,0 +1,55 @@
+# 一整列文本：Series.apply(full_parse) 和 parse_column 比时间、内存（tracemalloc 的峰值，和跑完还留着的，基本就是结果本身）
+# python -m cn2t.benchmarks.column [行数] [不同的文本数]
+from __future__ import annotations
+
+import datetime
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from cn2t import Parser
+from cn2t.benchmarks.corpus import generate
+
+
+def run(func) -> tuple:
+    """(结果, 秒, 跑完还留着的字节, 峰值字节)；tracemalloc 会把纯 Python 的代码拖慢好几倍，所以时间和内存分两遍量，每遍都是新的 Parser"""
+    start = time.perf_counter()
+    result = func(Parser().warm())
+    elapsed = time.perf_counter() - start
+    parser = Parser().warm()
+    tracemalloc.start()
+    try:
+        kept = func(parser)  # 拿着不放，留着的那部分才算得到结果上
+        current, peak = tracemalloc.get_traced_memory()
+        del kept
+        return result, elapsed, current, peak
+    finally:
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    series = pd.Series(generate(number, int(sys.argv[2]) if len(sys.argv) > 2 else 5000), dtype=object)
+    series[::1000] = None  # 真实的列总有几个空的
+    base = datetime.datetime(2025, 8, 15, 12)
+    print(f"{number} rows, {series.nunique()} unique")
+    # apply 那边缓存照常开着，就是分析师平时的用法
+    applied, apply_time, apply_kept, apply_peak = run(
+        lambda parser: series.apply(lambda text: parser.parse(text, base=base) if isinstance(text, str) else None)
+    )
+    (starts, ends, codes), column_time, column_kept, column_peak = run(lambda parser: parser.parse_column(series, base=base))
+    for i in range(0, number, max(number // 2000, 1)):
+        value = applied.iloc[i]
+        if value == (datetime.datetime.min, datetime.datetime.min):
+            assert np.isnat(starts[i]) and codes[i] == -5, (series.iloc[i], codes[i])  # 啥也没认出来
+        elif isinstance(value, tuple):
+            assert codes[i] == 1 and (starts[i].item(), ends[i].item()) == value, (series.iloc[i], value, starts[i], ends[i])
+        else:
+            assert np.isnat(starts[i]) and codes[i] == (-2 if value is None and not isinstance(series.iloc[i], str) else value or 0), (series.iloc[i], value, codes[i])
+    print(f"{'':<14}{'time':>10}{'peak':>12}{'kept':>12}")
+    print(f"{'apply':<14}{apply_time:>9.2f}s{apply_peak / 2**20:>9.1f}MiB{apply_kept / 2**20:>9.1f}MiB")
+    print(f"{'parse_column':<14}{column_time:>9.2f}s{column_peak / 2**20:>9.1f}MiB{column_kept / 2**20:>9.1f}MiB")
+    print(f"{apply_time / column_time:.1f}x faster, {apply_peak / column_peak:.1f}x lower peak, {apply_kept / column_kept:.1f}x smaller result")
@@ -0,0 +1,105 @@
+# compare_test.py 和各个 benchmark 共用的测试样例
+TESTINGS = [
+    "2025年8月15日",
+    "贰零贰伍年捌月拾伍日",
+    "二〇二五年八月十五日",
+    "2025/08/15",
+    "2025年8月16日 14:30:45",
+    "2025-08-16 18:15:00",
+    "2025/08/16 23:59:59",
+    "二〇二五年八月十六日 下午三点半",
+    "二零二五年八月十六号 中午12点整",
+    "二五年8月16日 午夜12点",
+    "2025年8月16日 上午9时15分",
+    "2025-08-16 下午11:08",
+    "8月16日 凌晨3:20",
+    "8月16日 14:00",
+    "十二月三十一日 18:00",
+    "02月15日 09:30:00",
+    "16号晚上8点",
+    "01日 15:30",
+    "31日下午4点半",
+    "下午4点",
+    "上午10:15",
+    "23:45:30",
+    "今天",
+    "明天凌晨",
+    "昨天中午",
+    "三天后",
+    "两周前",
+    "下个月5号",
+    "下周二",
+    "上周三上午10点",
+    "公历2025年8月16日",
+    "2025年8月",
+    "8月",
+    "2025/8/16 PM 3:45",
+    "0001年1月1日",
+    "9999年12月31日 23:59:59",
+    "2024年2月29日",
+    "2025年13月1日",
+    "2025年2月30日",
+    "昨天25点",
+    "2025年农历八月十六",
+    "无效时间格式",
+    "2025年8月32日",
+    "嘉靖十五年",
+    "2023年10月1日",
+    "2024-05-20",
+    "2025年元旦",
+    "2022/12/31 18:30",
+    "2026年农历正月初一",
+    "今天",
+    "明天下午3点",
+    "大后天晚上",
+    "昨天上午9点",
+    "上周三",
+    "下个月5号",
+    "明年春节",
+    "3天后",
+    "32天后",
+    "40天后",
+    "100天后",
+    "45天前",
+    "两周前",
+    "1小时30分钟后",
+]
+
+# 吞吐量测试用：按模式随机生成，数字随便换，能造出很多不重复的文本
+_PATTERNS = [
+    "{y}年{m}月{d}日",
+    "{y}-{m:02}-{d:02} {h:02}:{mi:02}:00",
+    "{m}月{d}日 {h}:{mi:02}",
+    "{m}月{d}日下午{h12}点",
+    "{y}年{m}月{d}日 上午{h12}时{mi}分",
+    "{n}天后",
+    "{n}小时前",
+    "{n}周后",
+    "明天下午{h12}点",
+    "{d}号晚上{h12}点",
+]
+
+
+def generate(number: int, unique: int = 2000, seed: int = 0, skew: bool = True) -> list[str]:
+    """生成 number 条文本，从 unique 条不同的里按齐普夫分布抽（越靠前越常见），前面混着 TESTINGS；skew=False 就按顺序轮着来"""
+    import random
+
+    rng = random.Random(seed)
+    pool = list(TESTINGS)
+    while len(pool) < unique:
+        pattern = rng.choice(_PATTERNS)
+        pool.append(
+            pattern.format(
+                y=rng.randint(2000, 2030),
+                m=rng.randint(1, 12),
+                d=rng.randint(1, 28),
+                h=rng.randint(0, 23),
+                h12=rng.randint(1, 11),
+                mi=rng.randint(0, 59),
+                n=rng.randint(1, 30),
+            )
+        )
+    pool = pool[:unique]
+    if not skew:
+        return [pool[i % len(pool)] for i in range(number)]
+    return rng.choices(pool, weights=[1 / (rank + 1) for rank in range(len(pool))], k=number)
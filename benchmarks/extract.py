@@ -0,0 +1,66 @@
+# 长文档里抠时间：10KB 到 10MB 的“聊天记录”，看耗时是不是跟长度成正比，插进去的时间表达式能找回来多少
+# python -m cn2t.benchmarks.extract [最大 MB]
+from __future__ import annotations
+
+import datetime
+import random
+import sys
+import time
+
+from cn2t import Parser
+from cn2t.benchmarks.corpus import generate
+
+# 不含时间的正文，故意放了些容易误报的：一下、上海、3个、1.2、前后
+FILLER = [
+    "这个需求我们再讨论一下。",
+    "上海那边的同事已经把文档发过来了，",
+    "我买了3个苹果和两瓶水，",
+    "新版本1.2修了不少问题。",
+    "前后端的接口还没对齐，",
+    "你先看看，有问题随时说。",
+    "好的，收到。",
+    "会议室在三楼东边，",
+]
+
+
+def document(size: int, expressions: list[str], rng: random.Random) -> tuple[str, list[tuple[int, int]]]:
+    """拼一篇大约 size 字节（UTF-8）的文档，返回文档和插进去的表达式的位置"""
+    parts: list[str] = []
+    planted = []
+    length = nbytes = 0
+    while nbytes < size:
+        piece = rng.choice(FILLER)
+        if rng.random() < 0.3:
+            expression = rng.choice(expressions)
+            planted.append((length + 2, length + 2 + len(expression)))
+            piece = f"我们{expression}，" + piece
+        parts.append(piece)
+        length += len(piece)
+        nbytes += len(piece.encode())
+    return "".join(parts), planted
+
+
+if __name__ == "__main__":
+    largest = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    base = datetime.datetime(2025, 8, 15, 12)
+    parser = Parser(tokenizer="trie").warm()
+    parser.extract("预热一下，明天下午3点", base)
+    # 只插单独解析得出来的表达式，不然没法算找回率（“0001年1月1日”解析出来正好是 datetime.min，和“啥也没有”分不出来，也不要）
+    nothing = (datetime.datetime.min, datetime.datetime.min)
+    expressions = [text for text in sorted(set(generate(3000, 3000))) if isinstance(r := parser.parse(text, base=base), tuple) and r != nothing]
+    rng = random.Random(0)
+    size = 10 * 1024
+    while size <= largest * 1024 * 1024:
+        doc, planted = document(size, expressions, rng)
+        parser.engine.cache and parser.engine.cache.clear()
+        start = time.perf_counter()
+        found = parser.extract(doc, base)
+        elapsed = time.perf_counter() - start
+        spans = {(e.start, e.end) for e in found}
+        recall = sum(span in spans for span in planted) / len(planted)
+        extra = len(spans - set(planted))
+        print(
+            f"{size / 1024:8.0f}KB\t{elapsed * 1e3:9.1f}ms\t{size / 1024 / 1024 / elapsed:6.2f}MB/s\t"
+            f"{elapsed / size * 1e9:6.0f}ns/B\tfound {len(found):7d}\tplanted recall {recall:.1%}\tother {extra}"
+        )
+        size *= 10
@@ -0,0 +1,28 @@
+# 一大波垃圾输入（不认识的词、会在解析里炸掉的）的吞吐：以前每条都抛 NameError、打一遍调用栈，现在走 ParseResult + 限流日志
+# python -m cn2t.benchmarks.junk [条数]
+from __future__ import annotations
+
+import collections
+import datetime
+import logging
+import random
+import sys
+import time
+
+from cn2t import Parser
+
+JUNK = ["明天去上海", "asdf", "我想吃火锅", "下午茶", "3个苹果", "一下", "上下", "等等再说吧", "版本v2", "周末愉快"]
+
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stderr)
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = random.Random(0)
+    texts = [f"{rng.choice(JUNK)}{rng.randrange(1000)}" for _ in range(number)]  # 带个数字，每条都不一样，缓存帮不上忙
+    base = datetime.datetime(2025, 8, 15, 12)
+    parser = Parser(cache_size=0).warm()
+    start = time.perf_counter()
+    kinds = collections.Counter((result.error, result.stage) for result in map(lambda text: parser.parse_result(text, base), texts))
+    elapsed = time.perf_counter() - start
+    print(f"{number} junk texts: {elapsed / number * 1e6:.1f}us/text", file=sys.stderr)
+    for (error, stage), n in kinds.most_common():
+        print(f"  {error} @ {stage}: {n}", file=sys.stderr)
@@ -0,0 +1,106 @@
+# HTTP 服务压测：起一个 python -m cn2t.server 子进程（或者用 --url 指定现成的），开一堆 keep-alive 连接一直发
+# python -m cn2t.benchmarks.loadtest [--connections 32] [--requests 20000] [--batch 1] [-j 进程数] [--url http://127.0.0.1:8000]
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+from cn2t.benchmarks.corpus import generate
+
+
+async def client(host: str, port: int, bodies: list[bytes], latencies: list[float], errors: list[int]):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            writer.write(
+                f"POST /parse HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while (line := await reader.readline()) != b"\r\n":
+                name, _, value = line.decode().partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(host: str, port: int, bodies: list[bytes], connections: int) -> tuple[float, list[float], list[int]]:
+    latencies: list[float] = []
+    errors: list[int] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, bodies[i::connections], latencies, errors) for i in range(connections)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, seconds: float = 30):
+    deadline = time.monotonic() + seconds
+    while True:
+        try:
+            urllib.request.urlopen(url + "/metrics", timeout=1).read()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", help="压现成的服务；不写就自己起一个")
+    ap.add_argument("--connections", type=int, default=32)
+    ap.add_argument("--requests", type=int, default=20000)
+    ap.add_argument("--batch", type=int, default=1, help="每个请求带几条文本")
+    ap.add_argument("-j", "--processes", type=int, default=1, help="自己起服务的时候开几个进程")
+    args = ap.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "cn2t.server", "--port", str(port), "-j", str(args.processes)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    try:
+        wait_ready(url)
+        texts = generate(args.requests * args.batch, unique=5000)
+        bodies = [
+            json.dumps({"text": texts[i]} if args.batch == 1 else {"texts": texts[i * args.batch : (i + 1) * args.batch]}).encode()
+            for i in range(args.requests)
+        ]
+        parsed = urllib.parse.urlsplit(url)
+        elapsed, latencies, errors = asyncio.run(run(parsed.hostname or "127.0.0.1", parsed.port or 80, bodies, args.connections))
+        latencies.sort()
+        pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e3  # noqa: E731
+        print(f"{args.requests} requests x {args.batch} texts over {args.connections} connections in {elapsed:.2f}s")
+        print(f"{args.requests / elapsed:.0f} req/s, {args.requests * args.batch / elapsed:.0f} texts/s, {len(errors)} non-200")
+        print(f"latency p50 {pick(0.5):.2f}ms  p95 {pick(0.95):.2f}ms  p99 {pick(0.99):.2f}ms  max {latencies[-1] * 1e3:.2f}ms")
+        print("--- /metrics")
+        metrics = urllib.request.urlopen(url + "/metrics").read().decode()
+        print("\n".join(line for line in metrics.splitlines() if not line.startswith("#")))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,52 @@
+# 自带的农历表和 lunarcalendar 比：1900~2100 年每一个农历日期（含闰月）换出来的公历是不是一样，
+# 不存在的日期（小月三十、没有的闰月）是不是都报错；再比一下单次换算的耗时，以及整条解析农历时间的耗时
+# python -m cn2t.benchmarks.lunar（要装 lunarcalendar）
+from __future__ import annotations
+
+import datetime
+import timeit
+
+from lunarcalendar import Converter, DateNotExist, Lunar
+
+from cn2t import Parser
+from cn2t.lunar import FIRST_YEAR, LAST_YEAR, lunar_to_solar
+
+TEXTS = ("农历2025年正月初一", "2025年农历闰六月初一", "今年农历八月十五", "明年农历腊月廿三", "农历2023年闰二月十五")
+
+
+def reference(year: int, month: int, day: int, leap: bool) -> datetime.date | None:
+    try:
+        return Lunar(year, month, day, leap).to_date()
+    except DateNotExist:
+        return None
+
+
+def ours(year: int, month: int, day: int, leap: bool) -> datetime.date | None:
+    try:
+        return lunar_to_solar(year, month, day, leap)
+    except ValueError:
+        return None
+
+
+def per_call(func, dates: list[tuple[int, int, int, bool]]) -> float:
+    return min(timeit.repeat(lambda: [func(*date) for date in dates], number=1, repeat=5)) / len(dates)
+
+
+if __name__ == "__main__":
+    dates = [(year, month, day, leap) for year in range(FIRST_YEAR, LAST_YEAR + 1) for month in range(1, 13) for leap in (False, True) for day in range(1, 31)]
+    same = valid = 0
+    for date in dates:
+        if (expected := reference(*date)) == (got := ours(*date)):
+            same += 1
+            valid += expected is not None
+        else:
+            print(f"  {date}: lunarcalendar {expected}, cn2t {got}")
+    print(f"{len(dates)} lunar dates ({valid} exist), same {same}")
+
+    existing = [date for date in dates if ours(*date) is not None]
+    print(f"lunar_to_solar {per_call(ours, existing) * 1e9:8.0f}ns\tlunarcalendar {per_call(lambda *date: Converter.Lunar2Solar(Lunar(*date)), existing) * 1e9:8.0f}ns")
+
+    base = datetime.datetime(2025, 8, 15, 12)
+    parser = Parser(cache_size=0).warm()
+    full = min(timeit.repeat(lambda: [parser.parse(text, base=base) for text in TEXTS], number=200, repeat=5)) / 200 / len(TEXTS)
+    print(f"full_parse (lunar texts) {full * 1e6:6.1f}us")
@@ -0,0 +1,44 @@
+# parse_numeral 和以前用的 cn2an（smart 模式）比：an2cn 写出来的数、省掉开头“一”的（十一、十万）、
+# 带小数点的（十一点、二十四点、十一点五）、负数、大写，外加下面几条以前出过错的；cn2an 认得的都得一样
+# python -m cn2t.benchmarks.numeral（要装 cn2an）
+from __future__ import annotations
+
+import warnings
+
+import cn2an
+
+from cn2t.numeral import parse_numeral
+
+CASES = ("十一点", "二十四点", "十点", "两点", "廿点", "十一點", "负十一点", "十一点五", "二十四点零", "一点")
+
+
+def reference(text: str) -> int | None:
+    try:
+        return int(cn2an.cn2an(text, mode="smart"))
+    except (ValueError, KeyError):
+        return None
+
+
+def forms() -> set[str]:
+    found = set(CASES)
+    for number in [*range(200), 1000, 1005, 2025, 10000, 35000, 110000, 1000000, 10**8 + 5]:
+        for text in (cn2an.an2cn(number), cn2an.an2cn(number, "up")):
+            found |= {text, text + "点", text + "點", text + "点五", text + "点零五", "负" + text, "负" + text + "点"}
+            if text.startswith("一十"):
+                short = text[1:]  # 十一、十万
+                found |= {short, short + "点", short + "点三"}
+    return found
+
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore")  # cn2an 碰到 smart 模式的边角情况会一直警告
+    checked = same = 0
+    for text in sorted(forms()):
+        if (expected := reference(text)) is None:
+            continue  # cn2an 自己也不认的不比
+        checked += 1
+        if (got := parse_numeral(text)) == expected:
+            same += 1
+        else:
+            print(f"  {text}: cn2an {expected}, cn2t {got}")
+    print(f"{checked} numerals, same {same}")
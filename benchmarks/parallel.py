@@ -0,0 +1,34 @@
+# 多进程的扩展性：1 到 N 个进程解析同一批生成的文本，启动时间单独算
+# python -m cn2t.benchmarks.parallel [行数] [最多几个进程]
+from __future__ import annotations
+
+import datetime
+import os
+import sys
+import time
+
+from cn2t import Parser
+from cn2t.benchmarks.corpus import generate
+from cn2t.parallel import ParallelParser
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    most = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    texts = generate(number, unique=number, skew=False)  # 不重复，不让缓存把活干了
+    base = datetime.datetime(2025, 8, 15, 12)
+    start = time.perf_counter()
+    expected = Parser().warm().parse_many(texts, base)
+    single = time.perf_counter() - start
+    print(f"{number} rows, {len(set(texts))} unique, {os.cpu_count()} cpus")
+    print(f"in-process:\t{number / single:10.0f}/s")
+    processes = 1
+    while processes <= most:
+        start = time.perf_counter()
+        with ParallelParser(processes) as parser:
+            parser.parse_many(["今天"] * processes * 16, base)  # 等 worker 都起来、加载完
+            ready = time.perf_counter()
+            results = parser.parse_many(texts, base)
+            elapsed = time.perf_counter() - ready
+        assert results == expected, "多进程和单进程结果不一致"
+        print(f"{processes} proc:\t{number / elapsed:10.0f}/s\t({single / elapsed:.2f}x)\tstartup {ready - start:.2f}s")
+        processes = processes * 2 if processes * 2 <= most or processes == most else most
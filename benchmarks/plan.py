@@ -0,0 +1,37 @@
+# 同一句话对着一大堆基准时间算（补历史日志）：逐条 parse(text, base=...) 和 compile 一次再 Plan.evaluate 比
+# python -m cn2t.benchmarks.plan [基准时间个数]
+from __future__ import annotations
+
+import datetime
+import sys
+import time
+
+import numpy as np
+
+from cn2t import Parser
+
+TEXTS = ["下周二上午10点", "三天后", "明天下午3点", "三小时后", "10分钟后", "2025年8月15日"]
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    # 30 天里随机的事件时间，精确到秒
+    bases = np.datetime64("2025-08-01T00:00:00") + rng.integers(0, 30 * 86400, number).astype("timedelta64[s]")
+    sample = bases[:20000].astype(datetime.datetime)  # 逐条的太慢，抽 2 万条算平均
+    parser = Parser().warm()
+    print(f"{number} bases")
+    for text in TEXTS:
+        start = time.perf_counter()
+        looped = [parser.parse(text, base=base) for base in sample]
+        loop = (time.perf_counter() - start) / len(sample)
+        start = time.perf_counter()
+        plan = parser.compile(text)
+        starts, ends, codes = plan.evaluate(bases)
+        vectorized = time.perf_counter() - start
+        for i, result in enumerate(looped[:2000]):
+            assert result == (starts[i].item(), ends[i].item()), (text, sample[i], result, starts[i], ends[i])
+        keys = len(np.unique(bases.astype(f"datetime64[{plan.unit}]")))
+        print(
+            f"{text:<12}\tunit={plan.unit} ({keys:>6} distinct)\tloop {loop * number:7.2f}s (est.)\t"
+            f"plan {vectorized:6.3f}s\t{loop * number / vectorized:7.1f}x"
+        )
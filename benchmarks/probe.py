@@ -0,0 +1,33 @@
+# 埋点的开销：不开、抽 1%、全开各跑一遍 compare_test 的样例（不开结果缓存），再打印累计值和最慢的几条
+# python -m cn2t.benchmarks.probe
+from __future__ import annotations
+
+import datetime
+import json
+import timeit
+
+from cn2t import Parser
+from cn2t.benchmarks.corpus import TESTINGS
+from cn2t.probe import Instrumentation, Trace
+
+if __name__ == "__main__":
+    base = datetime.datetime(2025, 8, 15, 12)
+    parser = Parser(cache_size=0).warm()
+    traces: list[Trace] = []
+    configs = {
+        "off": None,
+        "sample=0.01": Instrumentation(sample=0.01),
+        "sample=1": Instrumentation(),
+        "sample=1+callback": Instrumentation(callback=traces.append),
+    }
+    best = dict.fromkeys(configs, float("inf"))
+    for _ in range(40):  # 几种轮流跑，取最快的一次，免得机器忽快忽慢
+        for label, instrumentation in configs.items():
+            parser.instrumentation = instrumentation
+            elapsed = timeit.timeit(lambda: [parser.parse(text, base=base) for text in TESTINGS], number=1)
+            best[label] = min(best[label], elapsed / len(TESTINGS))
+    for label, elapsed in best.items():
+        print(f"{label:<20}{elapsed * 1e6:8.1f}us/parse\t{elapsed / best['off'] - 1:+.1%}")
+    print(json.dumps(parser.instrumentation.snapshot() if parser.instrumentation else {}, indent=2))
+    for trace in sorted(traces[-len(TESTINGS) :], key=lambda trace: trace.total, reverse=True)[:5]:
+        print(trace)
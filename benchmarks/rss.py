@@ -0,0 +1,43 @@
+# 多进程部署每个 worker 占多少内存：1、8、32 个 worker，父进程预先加载（fork 继承）和每个 worker 自己加载比，
+# RSS 是每个 worker 看到的（共享的页也算），PSS 按共享的进程数摊，USS 是这个 worker 自己独占的（多开一个 worker 实际多花的）
+# 只能在 Linux 上跑（读 /proc/<pid>/smaps_rollup）
+# python -m cn2t.benchmarks.rss [worker 数...]
+from __future__ import annotations
+
+import datetime
+import multiprocessing
+import statistics
+import sys
+
+from cn2t.benchmarks.corpus import TESTINGS
+from cn2t.parallel import ParallelParser
+
+FIELDS = {"Rss:": "rss", "Pss:": "pss", "Private_Clean:": "uss", "Private_Dirty:": "uss"}
+
+
+def memory(pid: int) -> dict[str, int]:
+    """KiB"""
+    usage = dict.fromkeys(FIELDS.values(), 0)
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, *value = line.split()
+            if name in FIELDS:
+                usage[FIELDS[name]] += int(value[0])
+    return usage
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [1, 8, 32]
+    base = datetime.datetime(2025, 8, 15, 12)
+    print(f"{'tokenizer':<10}{'preload':<9}{'workers':>8}{'rss':>10}{'pss':>10}{'uss':>10}{'total pss':>12}")
+    for tokenizer in ("cutword", "trie"):
+        for preload in (False, True):
+            for processes in counts:
+                with ParallelParser(processes, tokenizer=tokenizer, preload=preload, mp_context=multiprocessing.get_context("fork")) as parser:  # 3.14 起默认不是 fork 了
+                    parser.parse_many(TESTINGS * processes, base)  # 每个 worker 都真的解析过，该分配的都分配了
+                    usages = [memory(pid) for pid in parser._executor._processes]  # type: ignore[attr-defined]
+                mean = {key: statistics.fmean(usage[key] for usage in usages) / 1024 for key in ("rss", "pss", "uss")}
+                total = sum(usage["pss"] for usage in usages) / 1024
+                print(
+                    f"{tokenizer:<10}{preload!s:<9}{processes:>8}{mean['rss']:>7.1f}MiB{mean['pss']:>7.1f}MiB{mean['uss']:>7.1f}MiB{total:>9.1f}MiB"
+                )
@@ -0,0 +1,29 @@
+# 冷启动对比：直接解析 yaml vs 读二进制快照
+# python -m cn2t.benchmarks.startup [次数]
+from __future__ import annotations
+
+import os
+import sys
+import timeit
+
+from cn2t.snapshot import compile_snapshot, load_yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FILES = [os.path.join(ROOT, name) for name in ("lexicon.yml", "templates.yaml")]
+
+
+def load_all(use_snapshot: bool):
+    return [load_yaml(path, use_snapshot=use_snapshot) for path in FILES]
+
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for path in FILES:
+        compile_snapshot(path)
+    assert load_all(True) == load_all(False), "快照和 yaml 内容不一致"
+
+    yaml_time = timeit.timeit(lambda: load_all(False), number=number) / number
+    snap_time = timeit.timeit(lambda: load_all(True), number=number) / number
+    print(f"yaml.safe_load:\t{yaml_time * 1e3:>8.2f}ms")
+    print(f"snapshot:\t{snap_time * 1e3:>8.2f}ms")
+    print(f"speedup:\t{yaml_time / snap_time:>8.1f}x")
@@ -0,0 +1,253 @@
+# 分阶段的基准测试：分词、合并数字、打标签、三个 parser、to_datetime 各自多久（p50/p95/p99）、分配多少内存，
+# 基准时间固定，结果可以存成 JSON，之后拿来比，慢了超过阈值就报出来（退出码 1，CI 里能直接用）
+# python -m cn2t.benchmarks.suite [--save base.json] [--compare base.json] [--threshold 0.1] [--competitors] [--samples]
+from __future__ import annotations
+
+import argparse
+import datetime
+import hashlib
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from cn2t import Parser, first_parser, second_parser, tag_numerals, third_parser, to_datetime
+from cn2t.benchmarks.corpus import TESTINGS
+from cn2t.numeral import merge_numerals
+
+BASE = datetime.datetime(2025, 8, 15, 12)
+STAGES = ("cutword", "run_merge_num", "add_tag", "first_parser", "second_parser", "third_parser", "to_datetime", "full_parse")
+COMPARED = ("p50", "p95")  # p99 抖得太厉害，只拿来看，不拿来判回归
+
+
+def pipeline(parser: Parser, text: str) -> list[tuple[str, Callable[[Any], Any]]]:
+    # 每个阶段吃上一个阶段的输出；second_parser、third_parser 会改传进来的结构体，所以每一轮都要从头跑一遍
+    engine = parser.engine
+    return [
+        ("cutword", lambda _: engine.cutter.cutword(text)),
+        ("run_merge_num", merge_numerals),  # 就是 run_merge_num，只是连数值一起给下一步，省得 add_tag 再算一遍
+        ("add_tag", lambda merged: tag_numerals(merged, engine=engine)),
+        ("first_parser", lambda tagged: first_parser(tagged, engine=engine)),
+        ("second_parser", lambda structs: second_parser(structs, engine=engine)),
+        ("third_parser", lambda structs: third_parser(structs, BASE)),
+        ("to_datetime", lambda out: to_datetime(*out, now=BASE)),
+    ]
+
+
+def timer_overhead() -> int:
+    clock = time.perf_counter_ns
+    return min(-clock() + clock() for _ in range(10000))
+
+
+def run_stages(parser: Parser, texts: list[str], repeat: int) -> dict[str, list[int]]:
+    """每个阶段每次调用的耗时（ns），所有样例放一起"""
+    clock = time.perf_counter_ns
+    overhead = timer_overhead()
+    samples: dict[str, list[int]] = {stage: [] for stage in STAGES}
+    for _ in range(repeat):
+        for text in texts:
+            value = None
+            for stage, func in pipeline(parser, text):
+                start = clock()
+                try:
+                    value = func(value)
+                except Exception:
+                    break  # 解析失败的样例（比如 2025年13月1日）后面的阶段就没有了
+                finally:
+                    samples[stage].append(max(clock() - start - overhead, 0))
+            start = clock()
+            parser.parse(text, base=BASE)
+            samples["full_parse"].append(max(clock() - start - overhead, 0))
+    return samples
+
+
+def run_allocs(parser: Parser, texts: list[str]) -> dict[str, float]:
+    """每个阶段每次调用的内存分配峰值（字节，取平均）；tracemalloc 很慢，所以和计时分开跑"""
+    peaks: dict[str, list[int]] = {stage: [] for stage in STAGES}
+    tracemalloc.start()
+    try:
+        for text in texts:
+            value = None
+            for stage, func in pipeline(parser, text):
+                tracemalloc.reset_peak()
+                current = tracemalloc.get_traced_memory()[0]
+                try:
+                    value = func(value)
+                except Exception:
+                    break
+                finally:
+                    peaks[stage].append(tracemalloc.get_traced_memory()[1] - current)
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            parser.parse(text, base=BASE)
+            peaks["full_parse"].append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    return {stage: statistics.fmean(values) if values else 0.0 for stage, values in peaks.items()}
+
+
+def summarize(timings: list[int]) -> dict[str, float]:
+    if len(timings) < 2:
+        return {"n": len(timings), "p50": float(sum(timings)), "p95": float(sum(timings)), "p99": float(sum(timings)), "mean": float(sum(timings))}
+    q = statistics.quantiles(timings, n=100, method="inclusive")
+    return {"n": len(timings), "p50": q[49], "p95": q[94], "p99": q[98], "mean": statistics.fmean(timings)}
+
+
+def competitors(texts: list[str], repeat: int) -> dict[str, dict[str, Any]]:
+    """装了哪个比哪个，没装的跳过"""
+    runners: dict[str, Callable[[str], Any]] = {}
+    try:
+        import jionlp
+
+        def run_jionlp(text: str):
+            try:
+                result = jionlp.parse_time(text, time_base=BASE.timestamp()).get("time")
+                return tuple(result) if isinstance(result, list) and isinstance(result[0], str) else None
+            except Exception:
+                return None
+
+        runners["jionlp"] = run_jionlp
+    except ImportError:
+        print("jionlp 没装，跳过", file=sys.stderr)
+    try:
+        import dateparser
+
+        runners["dateparser"] = lambda text: dateparser.parse(text, languages=["zh"], settings={"RELATIVE_BASE": BASE})
+    except ImportError:
+        print("dateparser 没装，跳过", file=sys.stderr)
+    report = {}
+    for name, run in runners.items():
+        timings, results = [], {}
+        for text in texts:
+            each = time_each(run, text, repeat)
+            results[text] = (run(text), statistics.median(each))
+            timings += each
+        report[name] = {"timing": summarize(timings), "results": results}
+    return report
+
+
+def format_result(result: Any) -> str:
+    if result is None:
+        return "<解析失败>"
+    if isinstance(result, int):
+        return {-1: "<无效时间>", -2: "<解析失败>", -3: "<时间溢出>", -4: "<缺农历库>"}.get(result, str(result))
+    if isinstance(result, datetime.datetime):
+        return result.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(result, tuple):
+        return " ~ ".join(format_result(part) if not isinstance(part, str) else part for part in result)
+    return str(result)
+
+
+def measure(args: argparse.Namespace) -> dict[str, Any]:
+    parser = Parser(cache_size=0, tokenizer=args.tokenizer).warm()  # 不开结果缓存，量的是真正跑一遍
+    texts = list(TESTINGS)
+    for text in texts:
+        parser.parse(text, base=BASE)  # 预热 lru_cache、编译好的 MOD 这些
+    timings = run_stages(parser, texts, args.repeat)
+    allocs = run_allocs(parser, texts)
+    report: dict[str, Any] = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "tokenizer": args.tokenizer,
+            "repeat": args.repeat,
+            "base": BASE.isoformat(),
+            "corpus": hashlib.sha256("\n".join(texts).encode()).hexdigest()[:16],
+        },
+        "stages": {stage: {**summarize(timings[stage]), "alloc": allocs[stage]} for stage in STAGES},
+    }
+    if args.competitors or args.samples:
+        others = competitors(texts, args.repeat) if args.competitors else {}
+        report["competitors"] = {name: other["timing"] for name, other in others.items()}
+        if args.samples:
+            print("测试时间:", report["meta"]["date"], "基准时间:", BASE)
+            for text in texts:
+                print("=" * 48)
+                print(text)
+                own = statistics.median(time_each(lambda text: parser.parse(text, base=BASE), text, args.repeat))
+                print(f"{'cn2t:':<16}{own / 1e3:>8.1f}μs\t{format_result(parser.parse(text, base=BASE))}")
+                for name, other in others.items():
+                    result, median = other["results"][text]
+                    print(f"{name + ':':<16}{median / 1e3:>8.1f}μs\t{format_result(result)}")
+                print()
+    return report
+
+
+def time_each(run: Callable[[str], Any], text: str, repeat: int) -> list[int]:
+    clock = time.perf_counter_ns
+    timings = []
+    for _ in range(repeat):
+        start = clock()
+        run(text)
+        timings.append(clock() - start)
+    return timings
+
+
+def print_report(report: dict[str, Any]):
+    print(f"{'stage':<16}{'p50':>10}{'p95':>10}{'p99':>10}{'mean':>10}{'alloc':>12}")
+    for stage, row in report["stages"].items():
+        print(
+            f"{stage:<16}{row['p50'] / 1e3:>8.1f}μs{row['p95'] / 1e3:>8.1f}μs{row['p99'] / 1e3:>8.1f}μs"
+            f"{row['mean'] / 1e3:>8.1f}μs{row['alloc'] / 1024:>9.2f}KiB"
+        )
+    for name, row in report.get("competitors", {}).items():
+        print(f"{name:<16}{row['p50'] / 1e3:>8.1f}μs{row['p95'] / 1e3:>8.1f}μs{row['p99'] / 1e3:>8.1f}μs{row['mean'] / 1e3:>8.1f}μs")
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """返回变慢超过阈值的 阶段/分位数"""
+    if baseline["meta"].get("corpus") != report["meta"]["corpus"]:
+        print("注意：样例和基线的不一样，比出来不一定准", file=sys.stderr)
+    if baseline["meta"].get("tokenizer") != report["meta"]["tokenizer"]:
+        print("注意：分词器和基线的不一样", file=sys.stderr)
+    slower = []
+    print(f"\n{'stage':<16}" + "".join(f"{key:>18}" for key in COMPARED) + f"{'alloc':>18}")
+    for stage, row in report["stages"].items():
+        if (old := baseline["stages"].get(stage)) is None:
+            continue
+        cells = []
+        for key in (*COMPARED, "alloc"):
+            ratio = row[key] / old[key] - 1 if old[key] else 0.0
+            flag = ""
+            if key in COMPARED and ratio > threshold:
+                slower.append(f"{stage} {key}")
+                flag = " !"
+            cells.append(f"{ratio:>+15.1%}{flag:<3}")
+        print(f"{stage:<16}" + "".join(cells))
+    return slower
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m cn2t.benchmarks.suite", description="分阶段基准测试")
+    ap.add_argument("--repeat", type=int, default=200, help="每个样例跑几轮（默认 200）")
+    ap.add_argument("--tokenizer", choices=("cutword", "trie"), default="cutword")
+    ap.add_argument("--save", metavar="PATH", help="结果存成 JSON 基线")
+    ap.add_argument("--compare", metavar="PATH", help="和之前存的基线比")
+    ap.add_argument("--threshold", type=float, default=0.1, help="p50/p95 慢了超过多少算回归（默认 0.1，即 10%%）")
+    ap.add_argument("--competitors", action="store_true", help="顺便比一下 jionlp、dateparser（装了才比）")
+    ap.add_argument("--samples", action="store_true", help="逐条打印解析结果（compare_test.py 那张表）")
+    args = ap.parse_args(argv)
+
+    report = measure(args)
+    print_report(report)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if slower := compare(report, baseline, args.threshold):
+            print(f"\n比基线慢了超过 {args.threshold:.0%}: {', '.join(slower)}")
+            return 1
+        print(f"\n没有超过 {args.threshold:.0%} 的回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+# 模板索引的效果：在 compare_test.py 的样例上统计 second_parser 实际尝试了多少个（模板, 位置）
+# python -m cn2t.benchmarks.templates
+from __future__ import annotations
+
+from cn2t import Parser
+from cn2t.benchmarks.corpus import TESTINGS
+
+if __name__ == "__main__":
+    parser = Parser(cache_size=0).warm()  # 不开结果缓存，量的是真正跑一遍的开销
+    index = parser.engine.index
+    for testing in TESTINGS:
+        parser.parse(testing)
+    before = index.tried + index.skipped  # 没有索引的时候每个（模板, 位置）都要 check 一遍
+    print(f"templates:\t{len(index.templates):>8}")
+    print(f"samples:\t{len(TESTINGS):>8}")
+    print(f"before:\t\t{before:>8}\t({before / len(TESTINGS):.1f}/sample)")
+    print(f"after:\t\t{index.tried:>8}\t({index.tried / len(TESTINGS):.1f}/sample)")
+    print(f"skipped:\t{index.skipped / before:>8.1%}")
@@ -0,0 +1,52 @@
+# 字典树分词和 cutword 比：compare_test.py 的样例上分词、解析结果是不是一样，分词/整条解析的耗时，以及冷启动
+# python -m cn2t.benchmarks.tokenizer
+from __future__ import annotations
+
+import datetime
+import subprocess
+import sys
+import timeit
+
+from cn2t import Parser
+from cn2t.benchmarks.corpus import TESTINGS, generate
+
+_STARTUP = """
+import time
+start = time.perf_counter()
+from cn2t import Parser
+Parser(tokenizer={tokenizer!r}).warm()
+print(time.perf_counter() - start)
+"""
+
+
+def startup(tokenizer: str, repeat: int = 5) -> float:
+    # 每次都开新进程，算上 import cutword、建分词器这些
+    return min(
+        float(subprocess.run([sys.executable, "-c", _STARTUP.format(tokenizer=tokenizer)], capture_output=True, text=True, check=True).stdout)
+        for _ in range(repeat)
+    )
+
+
+def per_call(func, texts: list[str]) -> float:
+    return min(timeit.repeat(lambda: [func(text) for text in texts], number=5, repeat=7)) / 5 / len(texts)
+
+
+if __name__ == "__main__":
+    base = datetime.datetime(2025, 8, 15, 12)
+    parsers = {name: Parser(cache_size=0, tokenizer=name).warm() for name in ("cutword", "trie")}
+    cutword, trie = parsers["cutword"], parsers["trie"]
+    for label, texts in (("compare_test", TESTINGS), ("generated", sorted(set(generate(5000, 5000))))):
+        tokens_same = results_same = 0
+        for text in texts:
+            a, b = cutword.engine.cutter.cutword(text), trie.engine.cutter.cutword(text)
+            tokens_same += a == b
+            if (ra := cutword.parse(text, base=base)) == (rb := trie.parse(text, base=base)):
+                results_same += 1
+            else:
+                print(f"  {text!r}\n    cutword {a} -> {ra}\n    trie    {b} -> {rb}")
+        print(f"{label}: {len(texts)} texts, same tokens {tokens_same}, same results {results_same}")
+    print()
+    for name, parser in parsers.items():
+        cut = per_call(parser.engine.cutter.cutword, TESTINGS)
+        full = per_call(lambda text: parser.parse(text, base=base), TESTINGS)
+        print(f"{name}:\ttokenize {cut * 1e6:6.1f}us\tfull_parse {full * 1e6:6.1f}us\tstartup {startup(name) * 1e3:6.0f}ms")
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    relative_hits: int  # 命中的是 second_parser 之后的结构体，后两步还得按基准时间重算
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class ResultCache:
+    # 文本 -> 解析结果的 LRU。和基准时间无关的存最终结果；相对时间（明天、下周二）存 second_parser 之后的结构体列表
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.relative_hits = self.misses = self.evictions = 0
+
+    def get(self, text: str) -> Any:
+        """没有返回 None"""
+        with self._lock:
+            value = self._data.get(text)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(text)
+            self.hits += 1
+            if isinstance(value, list):
+                self.relative_hits += 1
+            return value
+
+    def put(self, text: str, value: Any):
+        with self._lock:
+            self._data[text] = value
+            self._data.move_to_end(text)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.relative_hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.relative_hits, self.misses, self.evictions, self.maxsize, len(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
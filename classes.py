@@ -1,23 +1,81 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Literal
+from typing import ClassVar, Literal
+
+from .exprs import compile_raw
+
+# STOP 的各个特征（VAL、DESC……）各占一位，_stopped 存成位掩码；STOP_ALL 所有位都是 1
+_FEATURE_BITS: dict[str, int] = {}
+STOP_ALL = -1
+_UNSET = object()
+
+
+def feature_bit(feature: str) -> int:
+    if (bit := _FEATURE_BITS.get(feature)) is None:
+        bit = _FEATURE_BITS[feature] = 1 << len(_FEATURE_BITS)
+    return bit
 
 
 def tab(n, s):
     return "\n".join([f"{' ' * n}{ln}" for ln in str(s).split("\n")])
 
 
-class Struct:
-    body: Body | None = None
-    meta: Meta | None = None
-    datum: Datum | None = None
+class Node:
+    __slots__ = ("_stopped",)
+    _FIELDS: ClassVar[tuple[str, ...]] = ()
+    _STOP_BITS: ClassVar[dict[str, int]] = {}
+
+    def __init_subclass__(cls):
+        # 属性名 -> 对应 STOP 特征的位，省得每次 setattr 都 name.upper()
+        cls._STOP_BITS = {name: feature_bit(name.upper()) for name in cls._FIELDS}
 
     def __init__(self, kwargs=None, value=None, raw=None):
-        self._stopped = set()
+        setter = object.__setattr__
+        setter(self, "_stopped", 0)
+        for name in self._FIELDS:
+            setter(self, name, None)
         if kwargs is not None:
             self.add(**kwargs, value=value, raw=raw)
 
+    def stop(self, feat):
+        if self._stopped == STOP_ALL:
+            raise AttributeError("Cannot stop cuz it's already stopped")
+        if isinstance(feat, list):
+            bits = 0
+            for each in feat:
+                bits |= feature_bit(each)
+        elif feat == "ALL":
+            bits = STOP_ALL
+        else:
+            bits = feature_bit(feat)
+        object.__setattr__(self, "_stopped", self._stopped | bits)
+
+    def reset_stop(self):
+        object.__setattr__(self, "_stopped", 0)
+
+    def copy(self):
+        # 字段原样复制；有子结构或者可变字段的子类自己再覆盖一份
+        new = object.__new__(self.__class__)
+        setter = object.__setattr__
+        setter(new, "_stopped", self._stopped)
+        for name in self._FIELDS:
+            setter(new, name, getattr(self, name))
+        return new
+
+    def __setattr__(self, name, value):
+        if self._stopped & self._STOP_BITS.get(name, 0):
+            raise AttributeError(f"Cannot set {name}")
+        object.__setattr__(self, name, value)
+
+
+class Struct(Node):
+    __slots__ = ("body", "meta", "datum")
+    _FIELDS = __slots__
+    body: Body | None
+    meta: Meta | None
+    datum: Datum | None
+
     def add(
         self,
         BODY: dict | Literal["N/A"] | None = None,
@@ -27,7 +85,7 @@ class Struct:
         raw=None,
         STOP=None,
     ):
-        if self._stopped is None:
+        if self._stopped == STOP_ALL:
             raise AttributeError("Add failed cuz it's already stopped")
         if BODY == "N/A":
             self.body = None
@@ -82,45 +140,39 @@ class Struct:
                 return False
         return True
 
-    def stop(self, feat):
-        if self._stopped is None:
-            raise AttributeError("Cannot stop cuz it's already stopped")
-        if isinstance(feat, list):
-            self._stopped |= set(feat)
-        elif feat == "ALL":
-            self._stopped = None
-        else:
-            self._stopped.add(feat)
+    def copy(self) -> Struct:
+        # 深拷贝，子结构都要复制一份；str、数字、模板里的列表这些是共享的只读数据
+        new = object.__new__(Struct)
+        setter = object.__setattr__
+        setter(new, "_stopped", self._stopped)
+        setter(new, "body", None if self.body is None else self.body.copy())
+        setter(new, "meta", None if self.meta is None else self.meta.copy())
+        setter(new, "datum", None if self.datum is None else self.datum.copy())
+        return new
 
     def reset_stop(self):
-        self._stopped = set()
+        object.__setattr__(self, "_stopped", 0)
         if self.body is not None:
             self.body.reset_stop()
         if self.meta is not None:
             self.meta.reset_stop()
 
-    def __setattr__(self, name, value):
-        if name == "_stopped":
-            self.__dict__[name] = value
-        elif (self._stopped is None) or (name.upper() in self._stopped):
-            raise AttributeError(f"Cannot set {name}")
-        else:
-            self.__dict__[name] = value
-
     def __repr__(self):
         return f"\nSTRUCT\n{tab(2, repr(self.body))}\n{tab(2, repr(self.meta))}\n{tab(2, repr(self.datum))}"
 
 
-class Body(Struct):
-    val: int | None = None
-    desc: str | None = None
-    mod: list[float | str] | None = None
-    raw: str | None = None
+class Body(Node):
+    __slots__ = ("val", "desc", "mod", "raw")
+    _FIELDS = __slots__
+    val: int | None
+    desc: str | None
+    mod: list[float | str] | None
+    raw: str | None
 
     def add(
         self, VAL: int | Literal["N/A"] | None = None, DESC: str | None = None, MOD: float | str | None = None, value=None, raw=None, STOP=None
     ):
-        if self._stopped is None:
+        if self._stopped == STOP_ALL:
             raise AttributeError("Add failed cuz it's already stopped")
         if VAL == "N/A":
             self.val = None
@@ -143,10 +195,11 @@ class Body(Struct):
 
     def check(self, VAL: int | list[int] | Literal["N/A"] | None = None, DESC: str | None = None, MOD: float | str | None = None, RAW=None):
         try:
-            if RAW is not None and not (eval(RAW, {"raw": self.raw})):
-                return False
-            if VAL == "N/A" and self.val is not None:
+            if RAW is not None and not compile_raw(RAW)(self.raw):
                 return False
+            if VAL == "N/A":
+                if self.val is not None:
+                    return False
             elif VAL is not None:
                 if self.val is None:
                     return False
@@ -175,17 +228,26 @@ class Body(Struct):
         except TypeError:
             return False
 
-    def reset_stop(self):
-        self._stopped = set()
+    def copy(self) -> Body:
+        new = object.__new__(Body)
+        setter = object.__setattr__
+        setter(new, "_stopped", self._stopped)
+        setter(new, "val", self.val)
+        setter(new, "desc", self.desc)
+        setter(new, "mod", None if self.mod is None else self.mod.copy())
+        setter(new, "raw", self.raw)
+        return new
 
     def __repr__(self):
         return f"BODY\n  VAL: {self.val}\n  DESC: {self.desc}\n  MOD: {self.mod}\n  RAW: {self.raw}"
 
 
-class Meta(Struct):
-    ID: str | None = None
-    step: Step | None = None
-    cycl: Cycl | None = None
+class Meta(Node):
+    __slots__ = ("ID", "step", "cycl")
+    _FIELDS = __slots__
+    ID: str | None
+    step: Step | None
+    cycl: Cycl | None
 
     def add(
         self,
@@ -196,7 +258,7 @@ class Meta(Struct):
         raw=None,
         STOP=None,
     ):
-        if self._stopped is None:
+        if self._stopped == STOP_ALL:
             raise AttributeError("Add failed cuz it's already stopped")
         if ID == "N/A":
             self.ID = None
@@ -251,8 +313,17 @@ class Meta(Struct):
         except TypeError:
             return False
 
+    def copy(self) -> Meta:
+        new = object.__new__(Meta)
+        setter = object.__setattr__
+        setter(new, "_stopped", self._stopped)
+        setter(new, "ID", self.ID)
+        setter(new, "step", None if self.step is None else self.step.copy())
+        setter(new, "cycl", None if self.cycl is None else self.cycl.copy())
+        return new
+
     def reset_stop(self):
-        self._stopped = set()
+        object.__setattr__(self, "_stopped", 0)
         if self.step is not None:
             self.step.reset_stop()
         if self.cycl is not None:
@@ -262,12 +333,14 @@ class Meta(Struct):
         return f"META\n  ID: {self.ID}\n{tab(2, repr(self.step))}\n{tab(2, repr(self.cycl))}"
 
 
-class Step(Struct):
-    perc: str | None = None
-    amp: float | None = None
+class Step(Node):
+    __slots__ = ("perc", "amp")
+    _FIELDS = __slots__
+    perc: str | None
+    amp: float | None
 
     def add(self, PERC: str | None = None, AMP: float | Literal["N/A"] | None = None, value=None, raw=None, STOP=None):
-        if self._stopped is None:
+        if self._stopped == STOP_ALL:
             raise AttributeError("Add failed cuz it's already stopped")
         if PERC == "N/A":
             self.perc = None
@@ -305,16 +378,15 @@ class Step(Struct):
         except TypeError:
             return False
 
-    def reset_stop(self):
-        self._stopped = set()
-
     def __repr__(self):
         return f"STEP\n  PERC: {self.perc}\n  AMP: {self.amp}"
 
 
-class Cycl(Struct):
-    period: float | None = None
-    range: tuple[float, float] | None = None
+class Cycl(Node):
+    __slots__ = ("period", "range")
+    _FIELDS = __slots__
+    period: float | None
+    range: tuple[float, float] | None
 
     def add(
         self,
@@ -324,7 +396,7 @@ class Cycl(Struct):
         raw=None,
         STOP=None,
     ):
-        if self._stopped is None:
+        if self._stopped == STOP_ALL:
             raise AttributeError("Add failed cuz it's already stopped")
         if PERIOD == "N/A":
             self.period = None
@@ -369,14 +441,52 @@ class Cycl(Struct):
         except TypeError:
             return False
 
-    def reset_stop(self):
-        self._stopped = set()
-
     def __repr__(self):
         return f"CYCL\n  PERIOD: {self.period}\n  RANGE: {self.range}"
 
 
+class Prototype:
+    # 词库里每个词条预先建好的 Struct，first_parser 遇到的时候拷一份就行，不用每次重新解析 AS_WORD
+    __slots__ = ("struct", "at_val")
+
+    def __init__(self, kwargs: dict):
+        self.struct = Struct(kwargs)
+        body = kwargs.get("BODY")
+        self.at_val = isinstance(body, dict) and body.get("VAL") == "@"
+
+    def make(self, value=None, raw=None) -> Struct:
+        struct = self.struct.copy()
+        if (body := struct.body) is not None:
+            if self.at_val and value is not None:
+                object.__setattr__(body, "val", value)  # 原本是在 STOP 之前就代入的
+            if raw is not None:
+                body.raw = raw
+        return struct
+
+
+def build_prototypes(lexicon: dict) -> dict[int, Prototype]:
+    """id(AS_WORD 或 EXPAND 里的 STRUCT 字典) -> Prototype；用锚点共享的词条共用一个"""
+    prototypes: dict[int, Prototype] = {}
+    for entry in lexicon.values():
+        if not isinstance(entry, dict) or not (as_word := entry.get("AS_WORD")):
+            continue
+        if isinstance(expand := as_word.get("EXPAND"), list):
+            sources = [expanding.get("STRUCT", {}) for expanding in expand]
+        else:
+            sources = [as_word]
+        for source in sources:
+            if id(source) in prototypes:
+                continue
+            try:
+                prototypes[id(source)] = Prototype(source)
+            except (AttributeError, TypeError):
+                pass  # 建不出来的留给 first_parser 现场建，报错也在那时候报
+    return prototypes
+
+
 class Datum:
+    __slots__ = ("year", "month", "day", "hour", "minute", "second", "lunar", "leap")
+
     def __init__(self, datum: dict | datetime):
         if isinstance(datum, datetime):
             self.year = datum.year
@@ -393,6 +503,7 @@ class Datum:
             self.minute: int | None = datum.get("minute")
             self.second: int | None = datum.get("second")
             self.lunar: bool | None = datum.get("lunar")
+            self.leap: bool | None = datum.get("leap")  # 闰月
 
     def get_from_id(self, ID: str, amp: float = 1):
         match ID, amp:
@@ -417,6 +528,13 @@ class Datum:
             case _:
                 raise KeyError(f"Unknown ID: {ID}")
 
+    def copy(self) -> Datum:
+        new = object.__new__(Datum)
+        for name in Datum.__slots__:
+            if (value := getattr(self, name, _UNSET)) is not _UNSET:
+                setattr(new, name, value)
+        return new
+
     def update(self, other: Datum):
         if other.year is not None:
             self.year = other.year
@@ -432,10 +550,12 @@ class Datum:
             self.second = other.second
         if other.lunar is not None:
             self.lunar = other.lunar
+        if other.leap is not None:
+            self.leap = other.leap
 
     def __repr__(self):
         return (
             f"DATUM\n  {self.year or "NA"}-{self.month or "NA":02}-{self.day or "NA":02} "
             f"{"--" if self.hour is None else self.hour:02}:{"--" if self.minute is None else self.minute:02}:"
-            f"{"--" if self.second is None else self.second:02}{"（农历）"*bool(self.lunar)}"
+            f"{"--" if self.second is None else self.second:02}{"（农历）"*bool(self.lunar)}{"（闰月）"*bool(self.leap)}"
         )
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING, Any
+
+from .classes import Datum
+from .result import CODE_OK
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from . import Parser
+
+# 一整列（DataFrame 的一列、几千万行日志）要解析的时候用：Series.apply(full_parse) 每行两个 datetime 对象，
+# 失败的还混着 -1~-4 的整数，一列 object 又大又难用。这里先把这一列去重（pandas 的 factorize，没装就用 dict），
+# 每个不同的文本解析一次，结果写进 datetime64[s] / int8 的小数组，最后按下标一次铺回去
+
+MISSING_CODE = -2  # None、NaN 这种根本不是文本的，当“不认识”
+
+
+def factorize(texts: Any) -> tuple[np.ndarray, Any]:
+    """返回 (每行是第几个不同的值, 不同的值)；缺失的行是 -1"""
+    import numpy as np
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+    if pd is not None:
+        if not isinstance(texts, (pd.Series, pd.Index, np.ndarray)):
+            texts = np.asarray(texts if isinstance(texts, list) else list(texts), dtype=object)
+        return pd.factorize(texts)
+    seen: dict[Any, int] = {}
+    labels = np.fromiter(
+        (seen.setdefault(text, len(seen)) if isinstance(text, str) else -1 for text in texts),
+        dtype=np.intp,
+    )
+    return labels, list(seen)
+
+
+def parse_column(
+    parser: Parser, texts: Any, base: datetime.datetime | None = None, enable_dateutil_trial=False
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    import numpy as np
+
+    from . import _NOTHING, NOTHING_FOUND
+
+    labels, uniques = factorize(texts)
+    engine = parser.engine
+    base = base or datetime.datetime.now()
+    datum = Datum(base)
+    # 多留一格给缺失的行：factorize 给它们的下标是 -1，正好取到最后一格
+    starts = np.full(len(uniques) + 1, np.datetime64("NaT", "s"))
+    ends = starts.copy()
+    codes = np.full(len(uniques) + 1, CODE_OK, dtype=np.int8)
+    codes[-1] = MISSING_CODE
+    for i, text in enumerate(uniques):
+        if not isinstance(text, str):
+            codes[i] = MISSING_CODE
+            continue
+        result = parser._parse(text, engine, enable_dateutil_trial, base, datum)
+        if result.code is not None:
+            codes[i] = result.code
+        elif (result.start, result.end) == _NOTHING:
+            codes[i] = NOTHING_FOUND  # 空字符串、“以后”：不能当成 0001-01-01
+        else:
+            starts[i], ends[i] = result.start, result.end
+    return starts[labels], ends[labels], codes[labels]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import ast
+import datetime
+import functools
+import math
+from collections.abc import Callable
+from typing import Any
+
+# MOD/RAW 表达式能看到的全局变量；val、datum 这些每次都不一样的作为参数传进去，不用每次现建字典
+_GLOBALS = {"datetime": datetime, "math": math}
+
+Mod = Callable[[Any, Any, Any, Any], Any]
+
+
+def _parse(source: str) -> ast.Expression:
+    try:
+        return ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"表达式有语法错误: {source!r}") from e
+
+
+def _lower(source: str, params: str) -> Callable:
+    # 表达式包成 lambda 只 eval 一次，之后就是普通的函数调用
+    _parse(source)
+    return eval(compile(f"lambda {params}: ({source})", f"<cn2t: {source}>", "eval"), dict(_GLOBALS))
+
+
+def is_tag(source: str) -> bool:
+    """形如 "'#after' and val" 的 MOD 只是个标签，求值结果恒为 val"""
+    node = _parse(source).body
+    if isinstance(node, ast.Name):
+        return node.id == "val"
+    if not isinstance(node, ast.BoolOp) or not isinstance(node.op, ast.And):
+        return False
+    *heads, last = node.values
+    return isinstance(last, ast.Name) and last.id == "val" and all(isinstance(head, ast.Constant) and head.value for head in heads)
+
+
+@functools.cache
+def compile_mod(source: str) -> Mod | None:
+    """MOD 表达式 -> f(val, datum, Cdatum, struct)；纯标签返回 None，表示不用求值"""
+    if is_tag(source):
+        return None
+    return _lower(source, "val, datum, Cdatum, struct")
+
+
+@functools.cache
+def reads_datum(source: str) -> bool:
+    """MOD 里有没有用到 datum/Cdatum，用到了结果就会随基准时间变"""
+    return any(isinstance(node, ast.Name) and node.id in ("datum", "Cdatum") for node in ast.walk(_parse(source)))
+
+
+@functools.cache
+def cdatum_fields(source: str) -> frozenset[str] | None:
+    """MOD 读了 Cdatum 的哪些字段；把 Cdatum 整个传出去了（看不出来读了啥）返回 None"""
+    tree = _parse(source)
+    fields = set()
+    attributes = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "Cdatum":
+            fields.add(node.attr)
+            attributes.add(id(node.value))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id == "Cdatum" and id(node) not in attributes:
+            return None
+    return frozenset(fields)
+
+
+@functools.cache
+def compile_raw(source: str) -> Callable[[str | None], Any]:
+    """RAW 表达式 -> f(raw)"""
+    return _lower(source, "raw")
+
+
+def warm(*tables: Any):
+    # 加载词库的时候把里面所有的 MOD 都先编译好
+    for table in tables:
+        if isinstance(table, dict):
+            for key, value in table.items():
+                if key == "MOD" and isinstance(value, str):
+                    compile_mod(value)
+                elif key == "RAW" and isinstance(value, str):
+                    compile_raw(value)
+                else:
+                    warm(value)
+        elif isinstance(table, list):
+            warm(*table)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+# 一大波乱七八糟的输入进来的时候，每条都格式化、写一遍调用栈会把 worker 卡死，
+# 所以日志走一个令牌桶：平时照常打，刷屏的时候多出来的直接丢掉（连格式化都不做），下一条打出来的时候说一声丢了几条
+
+
+class RateLimitedLogger:
+    def __init__(self, logger: logging.Logger, rate: float = 1.0, burst: int = 10):
+        self.logger = logger
+        self.rate = rate  # 每秒补几个令牌
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def _allow(self) -> int | None:
+        """能打就返回之前丢了几条，不能打返回 None"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens < 1:
+                self._dropped += 1
+                return None
+            self._tokens -= 1
+            dropped, self._dropped = self._dropped, 0
+            return dropped
+
+    def log(self, level: int, msg: str, *args, exc_info: bool = False):
+        if not self.logger.isEnabledFor(level) or (dropped := self._allow()) is None:
+            return
+        if dropped:
+            msg = f"{msg} (另外还有 {dropped} 条被限流丢掉了)"
+        self.logger.log(level, msg, *args, exc_info=exc_info)
+
+    def exception(self, msg: str, *args):
+        """在 except 里调；被限流的时候调用栈不会格式化"""
+        self.log(logging.ERROR, msg, *args, exc_info=True)
+
+    def warning(self, msg: str, *args):
+        self.log(logging.WARNING, msg, *args)
+
+
+logger = RateLimitedLogger(logging.getLogger("cn2t"))
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import datetime
+from array import array
+
+# 农历 1900~2100 年的表，农历转公历直接查表，不用再每次去 lunarcalendar 里一个月一个月地数。
+# 每年一个整数（从 lunarcalendar 的表里抽出来的）：
+#   低 13 位是每个月大还是小（第 12 位是正月，往下依次，有闰月的话闰月排在它那个月后面；1 是 30 天，0 是 29 天），
+#   13~16 位是闰几月（0 是没有闰月），17 位往上是正月初一离 1900-01-01 几天。
+# 超出这个范围的才去找 lunarcalendar（装了的话），见 to_datetime
+
+FIRST_YEAR = 1900
+LAST_YEAR = 2100
+
+_YEARS = (
+    0x0003d096d, 0x0033c095c, 0x0060014ae, 0x008c6aa4d, 0x00bc41a4c, 0x00e881b2a, 0x0114e8d55, 0x0144e0ad4,  # 1900
+    0x01712135a, 0x019d8495d, 0x01cd8095c, 0x01f9cd49b, 0x0229c149a, 0x025601a4a, 0x02824baa5, 0x02b2416a8,  # 1908
+    0x02de81ad4, 0x030ae52da, 0x033ae12b6, 0x03674e937, 0x03974092e, 0x03c381496, 0x03efcb64b, 0x041fc0d4a,  # 1916
+    0x044c00da8, 0x0478495b5, 0x04a86056c, 0x04d4a12ae, 0x05010492f, 0x05310092e, 0x055d4cc96, 0x058d21a94,  # 1924
+    0x05b961d4a, 0x05e5cada9, 0x0615c0b5a, 0x06422056c, 0x066e6726e, 0x069e6125c, 0x06caaf92d, 0x06faa192a,  # 1932
+    0x0726e1a94, 0x07532db4a, 0x0783216aa, 0x07af80ad4, 0x07dbc955b, 0x080be04ba, 0x08382125a, 0x08646592b,  # 1940
+    0x08946152a, 0x08c0af695, 0x08f0a0d94, 0x091ce16aa, 0x09494aab5, 0x0979409b4, 0x09a5814b6, 0x09d1e6a57,  # 1948
+    0x0a01e0a56, 0x0a2e3152a, 0x0a5e01d2a, 0x0a8a60d54, 0x0ab6ad5aa, 0x0ae6a156a, 0x0b130096c, 0x0b3f494ae,  # 1956
+    0x0b6f414ae, 0x0b9ba0a4c, 0x0bc7c7d26, 0x0bf7c1b2a, 0x0c242eb55, 0x0c5420ad4, 0x0c80612da, 0x0cacca95d,  # 1964
+    0x0cdcc095a, 0x0d090149a, 0x0d3549a4d, 0x0d6541a4a, 0x0d9191aa5, 0x0dc1816a8, 0x0dedc16d4, 0x0e1a2d2da,  # 1972
+    0x0e4a212b6, 0x0e7680936, 0x0ea2c9497, 0x0ed2c1496, 0x0eff1564b, 0x0f2f00d4a, 0x0f5b40da8, 0x0f878d5b4,  # 1980
+    0x0fb78156c, 0x0fe3e12ae, 0x10104a92f, 0x10404092e, 0x106c80c96, 0x1098c6d4a, 0x10c8a1d4a, 0x10f510d65,  # 1988
+    0x112500b58, 0x11514156c, 0x117dab26d, 0x11ada125c, 0x11d9e192c, 0x120629a95, 0x123621a94, 0x126261b4a,  # 1996
+    0x128ec4b55, 0x12bec0ad4, 0x12eb0f55b, 0x131b204ba, 0x13476125a, 0x1373ab92b, 0x13a3a152a, 0x13cfe1694,  # 2004
+    0x13fc296aa, 0x142c215aa, 0x145892ab5, 0x148880974, 0x14b4c14b6, 0x14e12ca57, 0x151120a56, 0x153d61526,  # 2012
+    0x1569a8e95, 0x1599a0d54, 0x15c5e15aa, 0x15f2449b5, 0x16224096c, 0x164e8d4ae, 0x167e8149c, 0x16aac1a4c,  # 2020
+    0x16d70bd26, 0x170701aa6, 0x173360b54, 0x175fa6d6a, 0x178fa12da, 0x17bc1695d, 0x17ec0095a, 0x18184149a,  # 2028
+    0x18448da4b, 0x187481a4a, 0x18a0c1aa4, 0x18cd0bb54, 0x18fd016b4, 0x192960ada, 0x1955c495b, 0x1985c0936,  # 2036
+    0x19b20f497, 0x19e201496, 0x1a0e4154a, 0x1a3a8b6a5, 0x1a6a80da4, 0x1a96c15b4, 0x1ac326ab6, 0x1af32126e,  # 2044
+    0x1b1f9092f, 0x1b4f8092e, 0x1b7bc0c96, 0x1ba80cd4a, 0x1bd7e1d4a, 0x1c0440d64, 0x1c308956c, 0x1c608155c,  # 2052
+    0x1c8ce125c, 0x1cb92792e, 0x1ce92192c, 0x1d156fa95, 0x1d4561a94, 0x1d71a1b4a, 0x1d9e0ab55, 0x1dce00ad4,  # 2060
+    0x1dfa414da, 0x1e26a8a5d, 0x1e56a0a5a, 0x1e82f152b, 0x1eb2e152a, 0x1edf21694, 0x1f0b6d6aa, 0x1f3b615aa,  # 2068
+    0x1f67c0ab4, 0x1f94094ba, 0x1fc4014b6, 0x1ff060a56, 0x201ca7527, 0x204ca0d26, 0x2078eee53, 0x20a8e0d54,  # 2076
+    0x20d5215aa, 0x21018a9b5, 0x21318096c, 0x215dc14ae, 0x218a28a4e, 0x21ba01a4c, 0x21e651d26, 0x221641aa4,  # 2084
+    0x224281b54, 0x226eecd6a, 0x229ee0ada, 0x22cb4095c, 0x22f78949d, 0x23278149a, 0x2353c1a2a, 0x238005b25,  # 2092
+    0x23b001aa4,  # 2100
+)
+
+# 展开成每个月初一的公历序数（date.toordinal()），每年 14 格：13 个月（没闰月的年份第 13 格和下一年正月初一一样）+ 下一年正月初一
+_STRIDE = 14
+_STARTS = array("l")
+_LEAPS = array("b")
+for _packed in _YEARS:
+    _start = datetime.date(FIRST_YEAR, 1, 1).toordinal() + (_packed >> 17)
+    _leap = (_packed >> 13) & 0xF
+    for _i in range(13):
+        _STARTS.append(_start)
+        if _i < 12 + bool(_leap):
+            _start += 30 if _packed >> (12 - _i) & 1 else 29
+    _STARTS.append(_start)
+    _LEAPS.append(_leap)
+del _packed, _start, _leap, _i
+
+
+def covers(year: int) -> bool:
+    return FIRST_YEAR <= year <= LAST_YEAR
+
+
+def lunar_to_ordinal(year: int, month: int, day: int, leap: bool = False) -> int:
+    """农历年月日 -> 公历序数；不存在的日期（没有这个闰月、小月三十）抛 ValueError，年份超出范围也是"""
+    if not covers(year):
+        raise ValueError(f"农历表只有 {FIRST_YEAR}~{LAST_YEAR} 年")
+    if not 1 <= month <= 12:
+        raise ValueError("无效的农历时间")
+    offset = year - FIRST_YEAR
+    has_leap = _LEAPS[offset]
+    if leap:
+        if has_leap != month:
+            raise ValueError("无效的农历时间")
+        index = month  # 闰月排在本月后面
+    else:
+        index = month - 1 if not has_leap or month <= has_leap else month
+    index += offset * _STRIDE
+    start = _STARTS[index]
+    if not 1 <= day <= _STARTS[index + 1] - start:
+        raise ValueError("无效的农历时间")
+    return start + day - 1
+
+
+def lunar_to_solar(year: int, month: int, day: int, leap: bool = False) -> datetime.date:
+    return datetime.date.fromordinal(lunar_to_ordinal(year, month, day, leap))
@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import bisect
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from .classes import Datum, Struct
+from .exprs import compile_raw
+from .probe import raw_counter
+
+ANY = object()  # 模板对这个特征没有要求
+_MISSING = object()
+
+Check = Callable[[Any], bool]
+Action = Callable[[list, int, int, int], int]
+
+Key = tuple[str | None, str | None, bool, tuple]
+
+
+def _requirement(cond: Any, key: str) -> Any:
+    # 从 WHEN 的 BODY/META 里取出某个字段的要求：N/A 表示必须为空，没写就是 ANY
+    if cond == "N/A":
+        return None
+    if not isinstance(cond, dict) or key not in cond:
+        return ANY
+    value = cond[key]
+    return None if value == "N/A" else value
+
+
+class Requirement:
+    # 一个 WHEN 条目里区分度高的几个特征，只用来快速排除，真正匹配还是靠 check
+    __slots__ = ("desc", "ID", "has_val", "mod")
+
+    def __init__(self, when: dict):
+        struct = when.get("STRUCT") or {}
+        body, meta = struct.get("BODY"), struct.get("META")
+        self.desc = _requirement(body, "DESC")
+        self.ID = _requirement(meta, "ID")
+        val = _requirement(body, "VAL")
+        self.has_val = val if val is ANY else val is not None
+        self.mod = _requirement(body, "MOD")
+
+    def accepts(self, key: Key) -> bool:
+        desc, ID, has_val, mods = key
+        if self.desc is not ANY and self.desc != desc:
+            return False
+        if self.ID is not ANY and (ID not in self.ID if isinstance(self.ID, list) else self.ID != ID):
+            return False
+        if self.has_val is not ANY and self.has_val != has_val:
+            return False
+        if self.mod is not ANY and (self.mod not in mods if self.mod is not None else mods):
+            return False
+        return True
+
+
+# region 条件编译
+# 把 WHEN 里嵌套的字典提前编译成闭包，语义和 classes.py 里的各个 check 一致，
+# 只是不用每次都解包 kwargs、比较 "N/A"、建 set 了
+
+
+def _all(checks: list[Check]) -> Check:
+    if not checks:
+        return lambda obj: True
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(obj) -> bool:
+        for each in checks:
+            if not each(obj):
+                return False
+        return True
+
+    return check
+
+
+def _is_none(attr: str) -> Check:
+    return lambda obj: getattr(obj, attr) is None
+
+
+def _equals(attr: str, expected: Any) -> Check:
+    return lambda obj: getattr(obj, attr) == expected
+
+
+def _one_of(attr: str, options: list) -> Check:
+    def check(obj) -> bool:
+        value = getattr(obj, attr)
+        return value is not None and value in options
+
+    return check
+
+
+def _between(attr: str, low: Any, high: Any) -> Check:
+    def check(obj) -> bool:
+        value = getattr(obj, attr)
+        try:
+            return value is not None and low <= value <= high
+        except TypeError:
+            return False
+
+    return check
+
+
+def _field(attr: str, spec: Any, ranged: bool = False) -> Check | None:
+    # ranged=True 的字段（VAL、AMP、PERIOD）用列表表示闭区间，否则列表表示多选一
+    if spec is None:
+        return None
+    if spec == "N/A":
+        return _is_none(attr)
+    if isinstance(spec, list):
+        return _between(attr, spec[0], spec[1]) if ranged else _one_of(attr, spec)
+    return _equals(attr, spec)
+
+
+def _unknown(level: str, cond: dict, known: tuple[str, ...]):
+    if unknown := set(cond) - set(known):
+        raise ValueError(f"{level}里有不认识的字段: {', '.join(sorted(unknown))}")
+
+
+def _compile_body(cond: dict, counted: bool = False) -> Check:
+    _unknown("BODY", cond, ("VAL", "DESC", "MOD", "RAW"))
+    checks = [c for c in (_field("val", cond.get("VAL"), True), _field("desc", cond.get("DESC"))) if c is not None]
+    if (mod := cond.get("MOD")) == "N/A":
+        checks.append(_is_none("mod"))
+    elif mod is not None:
+        checks.append(lambda body: body.mod is not None and mod in body.mod)
+    if (raw := cond.get("RAW")) is not None:
+        # RAW 最贵，放到最后
+        func = compile_raw(raw)
+
+        def check_raw(body) -> bool:
+            try:
+                return bool(func(body.raw))
+            except TypeError:
+                return False
+
+        def count_raw(body) -> bool:
+            raw_counter.evals += 1
+            return check_raw(body)
+
+        checks.append(count_raw if counted else check_raw)  # 计数的版本只有开了埋点才用
+    return _all(checks)
+
+
+def _compile_range(spec: Any) -> Check | None:
+    if spec is None:
+        return None
+    if spec == "N/A":
+        return _is_none("range")
+    if isinstance(spec, list):
+        r0_low, r0_high, r1_low, r1_high = spec
+
+        def check(cycl) -> bool:
+            value = cycl.range
+            try:
+                return value is not None and r0_low <= value[0] <= r0_high and r1_low <= value[1] <= r1_high
+            except TypeError:
+                return False
+
+        return check
+    return _equals("range", spec)
+
+
+def _compile_step(cond: dict) -> Check:
+    _unknown("STEP", cond, ("PERC", "AMP"))
+    return _all([c for c in (_field("perc", cond.get("PERC")), _field("amp", cond.get("AMP"), True)) if c is not None])
+
+
+def _compile_cycl(cond: dict) -> Check:
+    _unknown("CYCL", cond, ("PERIOD", "RANGE"))
+    return _all([c for c in (_field("period", cond.get("PERIOD"), True), _compile_range(cond.get("RANGE"))) if c is not None])
+
+
+def _compile_datum(cond: dict) -> Check:
+    expected = [(k.lower(), None if v == "N/A" else v) for k, v in cond.items()]
+
+    def check(datum) -> bool:
+        for attr, value in expected:
+            if getattr(datum, attr, _MISSING) != value:
+                return False
+        return True
+
+    return check
+
+
+def _child(attr: str, spec: Any, compile_inner: Callable[[dict], Check]) -> Check | None:
+    # 子结构为空的时候，只有条件里的值全是 N/A 才算匹配（"如果没有body那也一定没有子元素"）
+    if spec is None:
+        return None
+    if spec == "N/A":
+        return _is_none(attr)
+    inner = compile_inner(spec)
+    na_only = bool(spec) and all(v == "N/A" for v in spec.values())
+
+    def check(obj) -> bool:
+        child = getattr(obj, attr)
+        return na_only if child is None else inner(child)
+
+    return check
+
+
+def _compile_meta(cond: dict) -> Check:
+    _unknown("META", cond, ("ID", "STEP", "CYCL"))
+    checks = (_field("ID", cond.get("ID")), _child("step", cond.get("STEP"), _compile_step), _child("cycl", cond.get("CYCL"), _compile_cycl))
+    return _all([c for c in checks if c is not None])
+
+
+def compile_condition(cond: dict | None, counted: bool = False) -> Check:
+    """把一个 WHEN 条目的 STRUCT 编译成 Struct -> bool；counted 的话每求值一次 RAW 给 raw_counter 加一"""
+    cond = cond or {}
+    _unknown("STRUCT", cond, ("BODY", "META", "DATUM"))
+    checks = (
+        _child("body", cond.get("BODY"), lambda body: _compile_body(body, counted)),
+        _child("meta", cond.get("META"), _compile_meta),
+        _child("datum", cond.get("DATUM"), _compile_datum),
+    )
+    return _all([c for c in checks if c is not None])
+
+
+def compile_action(rule: dict) -> Action:
+    """把一个 THEN 条目编译成 (structs, start_idx, i, idx_offset) -> 新的 idx_offset"""
+    if (expand := rule.get("EXPAND")) is not None:
+        expanded = tuple(expanding.get("STRUCT", {}) for expanding in expand)
+        if not expanded:
+
+            def remove(structs: list, start_idx: int, i: int, idx_offset: int) -> int:
+                structs[start_idx + i + idx_offset] = None
+                return idx_offset - 1
+
+            return remove
+        if len(expanded) == 1:
+            only = expanded[0]
+
+            def merge(structs: list, start_idx: int, i: int, idx_offset: int) -> int:
+                structs[start_idx + i + idx_offset].add(**only)
+                return idx_offset
+
+            return merge
+
+        def split(structs: list, start_idx: int, i: int, idx_offset: int) -> int:
+            struct_pack = [structs[start_idx + i]] + [Struct()] * (len(expanded) - 1)
+            for pack_item, kwargs in zip(struct_pack, expanded):
+                pack_item.add(**kwargs)
+            structs[start_idx + i + idx_offset : start_idx + i + idx_offset + 1] = struct_pack
+            return idx_offset + len(struct_pack) - 1
+
+        return split
+    if struct_rule := rule.get("STRUCT"):
+
+        def add(structs: list, start_idx: int, i: int, idx_offset: int) -> int:
+            structs[start_idx + i + idx_offset].add(**struct_rule)
+            return idx_offset
+
+        return add
+    return lambda structs, start_idx, i, idx_offset: idx_offset
+
+
+# endregion
+
+
+class Template:
+    __slots__ = ("name", "when", "then", "stop", "size", "reqs", "checks", "actions", "_traced_checks")
+
+    def __init__(self, name: str, template: dict):
+        self.name = name
+        self.when: list[dict] = template.get("WHEN", [])
+        self.then: list[dict] = template.get("THEN", [])
+        self.stop: list[str] = template.get("STOP", [])
+        self.size = len(self.when)
+        assert len(self.then) == self.size
+        self.reqs = [Requirement(when) for when in self.when]
+        self.checks = [compile_condition(when.get("STRUCT")) for when in self.when]
+        self.actions = [compile_action(rule) for rule in self.then]
+        self._traced_checks: list[Check] | None = None
+
+    def traced_checks(self) -> list[Check]:
+        """和 checks 一样，只是会数 RAW 求值了几次；开了埋点的时候才用，第一次用到再编译"""
+        if self._traced_checks is None:
+            self._traced_checks = [compile_condition(when.get("STRUCT"), counted=True) for when in self.when]
+        return self._traced_checks
+
+
+def struct_key(struct: Struct | None) -> Key:
+    if struct is None:
+        return (None, None, False, ())
+    body, meta = struct.body, struct.meta
+    if body is None:
+        return (None, meta.ID if meta is not None else None, False, ())
+    return (body.desc, meta.ID if meta is not None else None, body.val is not None, tuple(body.mod) if body.mod else ())
+
+
+class TemplateIndex:
+    # 模板按原顺序编号。key -> {(模板编号, 第几个WHEN)}，表示这个位置可能匹配哪个模板的哪一项；用到哪个 key 才算哪个
+    def __init__(self, templates: dict):
+        self.templates = [Template(name, template) for name, template in templates.items()]
+        self._candidates: dict[Key, frozenset[tuple[int, int]]] = {}
+        # 统计用：实际尝试了多少次，被索引跳过了多少次
+        self.tried = 0
+        self.skipped = 0
+
+    def candidates(self, key: Key) -> frozenset[tuple[int, int]]:
+        if (found := self._candidates.get(key)) is None:
+            found = self._candidates[key] = frozenset(
+                (t_index, i)
+                for t_index, template in enumerate(self.templates)
+                for i, req in enumerate(template.reqs)
+                if req.accepts(key)
+            )
+        return found
+
+
+# region 按形状记忆
+# “2025年8月15日”“2024年3月1日”“1999年12月31日”分出来的结构体形状一样，second_parser 里匹配上的模板、顺序也一样，
+# 数字只在 VAL 的区间检查里起作用。所以把每个结构体抽象成“模板能看到的东西”：数字换成它落在模板 VAL 边界之间的哪一段，
+# RAW 换成每个 RAW 表达式的结果，其它（DESC、MOD、META、DATUM、STOP 位）原样，拼起来当键；
+# 第一次完整匹配的时候把匹配上的 (模板, 位置, 偏移) 记下来，之后同形状的直接按顺序执行那些模板的 THEN，一次检查都不做
+
+
+class ShapeInfo(NamedTuple):
+    hits: int
+    misses: int
+    fallbacks: int  # 抽象不了，只能完整匹配的次数
+    maxsize: int
+    currsize: int
+
+
+Replay = tuple[tuple[int, int, int], ...]
+
+
+def _raw_result(func: Callable, raw: Any) -> Any:
+    try:
+        return bool(func(raw))
+    except TypeError:
+        return False  # 和 check_raw 一样
+
+
+class ShapeCache:
+    def __init__(self, templates: list[Template], maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._replays: dict[tuple, Replay] = {}
+        self.hits = self.misses = self.fallbacks = 0
+        bounds: set[int] = set()
+        raws: dict[str, Callable] = {}
+        self.enabled = True
+        for template in templates:
+            for when in template.when:
+                body = (when.get("STRUCT") or {}).get("BODY")
+                if not isinstance(body, dict):
+                    continue
+                val = body.get("VAL")
+                # 区间 [low, high] 对整数来说就是 low 和 high+1 两个分界点；不是整数的边界没法这么切，整个关掉
+                if isinstance(val, list):
+                    if not all(type(bound) is int for bound in val):
+                        self.enabled = False
+                    else:
+                        bounds.update((val[0], val[1] + 1))
+                elif val is not None and val != "N/A":
+                    if type(val) is int:
+                        bounds.update((val, val + 1))
+                    elif isinstance(val, (int, float)):
+                        self.enabled = False
+                if isinstance(raw := body.get("RAW"), str):
+                    raws.setdefault(raw, compile_raw(raw))
+        self._bounds = sorted(bounds)
+        self._raws = tuple(raws.values())
+        self._raw_results: dict[str | None, tuple] = {None: tuple(_raw_result(func, None) for func in self._raws)}
+
+    def _raw_shape(self, raw: str | None) -> tuple:
+        # 原文就那么些（“2025”“十五”），算过的记下来
+        if (found := self._raw_results.get(raw)) is None:
+            found = tuple(_raw_result(func, raw) for func in self._raws)
+            if len(self._raw_results) < self.maxsize:
+                self._raw_results[raw] = found
+        return found
+
+    def _shape(self, structs: list) -> tuple:
+        bounds = self._bounds
+        shape = []
+        for struct in structs:
+            body, meta, datum = struct.body, struct.meta, struct.datum
+            if body is not None:
+                val = body.val
+                if type(val) is int:
+                    val = (bisect.bisect_right(bounds, val),)  # 包一层，和没抽象的值（None、小数）区分开
+                mod = body.mod
+                body = (
+                    body._stopped,
+                    val,
+                    body.desc,
+                    None if mod is None else tuple(mod),
+                    self._raw_shape(body.raw),
+                )
+            if meta is not None:
+                step, cycl = meta.step, meta.cycl
+                if step is not None:
+                    step = (step._stopped, step.perc, step.amp)
+                if cycl is not None:
+                    cycl = (cycl._stopped, cycl.period, tuple(cycl.range) if isinstance(cycl.range, list) else cycl.range)
+                meta = (meta._stopped, meta.ID, step, cycl)
+            if datum is not None:
+                datum = tuple(getattr(datum, name, _MISSING) for name in Datum.__slots__)
+            shape.append((struct._stopped, body, meta, datum))
+        return tuple(shape)
+
+    def lookup(self, structs: list) -> tuple[tuple | None, Replay | None]:
+        """返回 (键, 记下的匹配)；键是 None 表示抽象不了，只能完整匹配，也不用记"""
+        if not self.enabled:
+            self.fallbacks += 1
+            return None, None
+        try:
+            key = self._shape(structs)
+            replay = self._replays.get(key)
+        except (TypeError, AttributeError):
+            self.fallbacks += 1  # 有不可哈希的字段，或者不是 Struct 的东西
+            return None, None
+        if replay is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return key, replay
+
+    def record(self, key: tuple, replay: Replay):
+        if len(self._replays) < self.maxsize:  # 满了就不记了；形状一般就几百种
+            self._replays[key] = replay
+
+    def clear(self):
+        self._replays.clear()
+        self._raw_results = {None: self._raw_results[None]}
+        self.hits = self.misses = self.fallbacks = 0
+
+    def info(self) -> ShapeInfo:
+        return ShapeInfo(self.hits, self.misses, self.fallbacks, self.maxsize, len(self._replays))
+
+
+# endregion
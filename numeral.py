@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import functools
+import re
+
+# 中文数字识别。以前是先 int() 再 cn2an，每个词两次异常，还要导入 cn2an（很慢）。
+# 这里一遍扫完，支持阿拉伯数字、大小写中文数字、〇/零/两/幺/廿，以及“3万”“2千零5”这种混着写的
+
+_DIGITS = {
+    "零": 0, "〇": 0,
+    "一": 1, "壹": 1, "幺": 1,
+    "二": 2, "贰": 2, "两": 2, "貳": 2, "兩": 2,
+    "三": 3, "叁": 3, "參": 3,
+    "四": 4, "肆": 4,
+    "五": 5, "伍": 5,
+    "六": 6, "陆": 6, "陸": 6,
+    "七": 7, "柒": 7,
+    "八": 8, "捌": 8,
+    "九": 9, "玖": 9,
+}  # fmt: skip
+_UNITS = {"十": 10, "拾": 10, "百": 100, "佰": 100, "千": 1000, "仟": 1000}
+_BIG_UNITS = {"万": 10**4, "萬": 10**4, "亿": 10**8, "億": 10**8}
+
+# 能出现在数字里的字（阿拉伯数字用 isdecimal 判断，不在这里面）
+NUMERAL_CHARS = frozenset(_DIGITS) | frozenset(_UNITS) | frozenset(_BIG_UNITS) | {"廿"}
+
+# 1.5、2025.08、1.5万 这种：小数直接截断，和以前 int(cn2an(...)) 的结果一样
+_ASCII_DECIMAL = re.compile(r"(-?\d+)(?:\.\d+)?([十拾百佰千仟万萬亿億])?")
+
+
+def _integer(s: str) -> int | None:
+    # 整数部分的状态机：total 是已经乘过万/亿的部分，section 是当前万以内的部分，num 是还没遇到单位的数
+    total = section = 0
+    num: int | None = None
+    in_run = False  # num 是不是一串阿拉伯数字
+    zero = False  # 上一个单位之后出现过零
+    last_unit = 0  # 最近一个单位（万亿也算），给“三万五”“一百五”这种省略写法用
+    small_limit = big_limit = 10**9  # 单位必须从大到小
+    for ch in s:
+        if ch.isdecimal():
+            if num is not None and not in_run:
+                return None
+            num = (num if in_run else 0) * 10 + int(ch)
+            in_run = True
+            continue
+        in_run = False
+        if (digit := _DIGITS.get(ch)) is not None:
+            if num is not None:
+                return None
+            if digit == 0:
+                if zero or last_unit == 0:
+                    return None
+                zero = True
+            else:
+                num = digit
+        elif (unit := _UNITS.get(ch)) is not None:
+            if num is None:
+                # 十五、一百十、一千零十、一万零百：十、百前面的一可以省略
+                if not (zero and unit <= 100 or unit == 10 and (not section or last_unit == 100)):
+                    return None
+                num = 1
+            if unit >= small_limit or num >= 10:
+                return None
+            section += num * unit
+            num, zero, last_unit, small_limit = None, False, unit, unit
+        elif (unit := _BIG_UNITS.get(ch)) is not None:
+            part = section + (num or 0)
+            if part == 0 or part >= unit or unit >= big_limit:
+                return None
+            total += part * unit
+            section, num, zero, last_unit = 0, None, False, unit
+            small_limit = big_limit = unit
+        else:
+            return None
+    if num is None:
+        return None if zero or last_unit == 0 and not section else total + section
+    if last_unit and not zero and num < 10:
+        # 三万五 = 35000，两千五 = 2500，二十五 = 25
+        return total + section + num * (last_unit // 10)
+    if last_unit and num >= last_unit:
+        return None
+    return total + section + num
+
+
+def _chinese(s: str) -> int | None:
+    if all(ch in _DIGITS for ch in s):
+        # 二〇二五、一二三：逐位读
+        value = 0
+        for ch in s:
+            value = value * 10 + _DIGITS[ch]
+        return value
+    return _integer(s)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_numeral(s: str) -> int | None:
+    """数字（含中文数字）-> int，不是数字返回 None；小数截断"""
+    if s.isdecimal():
+        return int(s)  # 最常见的情况，全角数字也能直接 int
+    if s.isascii():
+        try:
+            return int(s)  # +3、-3、1_000 这些以前 int() 认的也照样认
+        except ValueError:
+            pass
+        match = _ASCII_DECIMAL.fullmatch(s)
+        return int(match[1]) if match else None
+    if not s:
+        return None
+    sign = 1
+    if s[0] == "负":
+        sign, s = -1, s[1:]
+    s = s.replace("廿", "二十")
+    if match := _ASCII_DECIMAL.fullmatch(s):
+        value = int(match[1])
+        if match[2]:
+            unit = _UNITS.get(match[2]) or _BIG_UNITS[match[2]]
+            value = int(float(s[:-1]) * unit)
+        return sign * value
+    if "点" in s or "點" in s:
+        # 十一点五 -> 11；小数点后面什么都没有（十一点、二十四点）也和 cn2an 一样当整数
+        head, _, tail = s.replace("點", "点").partition("点")
+        if not all(ch.isdecimal() or ch in _DIGITS for ch in tail):
+            return None
+        s = head
+    if not s:
+        return None
+    value = _chinese(s)
+    return None if value is None else sign * value
+
+
+def merge_numerals(words: list[str]) -> list[tuple[str, int | None]]:
+    """相邻的数字词拼成一个（二 〇 二五 -> 二〇二五），顺便带上数值，后面打标签不用再转一遍"""
+    result: list[tuple[str, int | None]] = []
+    run: list[str] = []
+    for word in words:
+        if parse_numeral(word) is not None:
+            run.append(word)
+            continue
+        if run:
+            result.append(_joined(run))
+            run = []
+        result.append((word, None))
+    if run:
+        result.append(_joined(run))
+    return result
+
+
+def _joined(run: list[str]) -> tuple[str, int | None]:
+    word = run[0] if len(run) == 1 else "".join(run)
+    return word, parse_numeral(word)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import collections
+import datetime
+import gc
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+from . import DEFAULT_LEXICON_PATH, DEFAULT_TEMPLATES_PATH, Parser
+from .watch import Watcher
+
+# 多进程解析：纯 Python、吃 CPU，线程有 GIL 没用，只能开进程。
+# 每个 worker 在 initializer 里把词库、模板、分词器加载好，之后只收文本块、回结果。
+# fork 的时候（Python 3.13 及以前 Linux 的默认）在父进程里先加载一份，worker 直接继承：cutword 的词典和加载好的数组按页共享（写时复制），
+# 不用每个 worker 各自加载一遍；fork 之前 gc.freeze()，免得子进程的 GC 去改这些对象的头，把页面一页页复制走。
+# spawn（Windows、macOS）和 forkserver（3.14 起 Linux 的默认）起的 worker 不继承父进程的内存，这时候不预先加载，每个 worker 还是各自加载。
+# reload 换上去的池子也是这样：那时候旧池子自己的管理线程还在，不能 fork，只能用 forkserver，所以只有第一个池子是预先加载的
+
+_worker: Parser | None = None
+_preloaded: dict[str, Any] | None = None  # 父进程预先加载 _worker 时用的参数
+
+
+def _init_worker(options: dict[str, Any]):
+    global _worker
+    if _worker is not None and _preloaded == options:
+        return  # fork 出来的，父进程已经加载好了
+    _worker = Parser(**options).warm()
+
+
+def _parse_chunk(texts: list[str], base: datetime.datetime) -> tuple[list, float]:
+    assert _worker is not None, "worker 没有初始化"
+    start = time.perf_counter()
+    results = _worker.parse_many(texts, base)
+    return results, time.perf_counter() - start
+
+
+def _parse_texts(texts: list[str], base: datetime.datetime | None) -> list:
+    assert _worker is not None, "worker 没有初始化"
+    return _worker.parse_many(texts, base)
+
+
+def _start(executor: ProcessPoolExecutor, processes: int):
+    """交一轮空活，等 worker 都起来、加载完；起不来就把池子关掉再抛"""
+    try:
+        for future in [executor.submit(_parse_texts, [], None) for _ in range(processes)]:
+            future.result()
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+class ParallelParser:
+    # 用法：with ParallelParser() as pp: for result in pp.map(texts): ...
+    # 块大小自适应：先发小块，按 worker 回报的速度调，让每块大概跑 target_seconds 秒
+    def __init__(
+        self,
+        processes: int | None = None,
+        *,
+        lexicon_path: str | None = None,
+        templates_path: str | None = None,
+        use_snapshot: bool = True,
+        dict_dir: str | None = None,
+        cache_size: int = 1024,
+        tokenizer: str = "cutword",
+        target_seconds: float = 0.05,
+        min_chunk: int = 16,
+        max_chunk: int = 4096,
+        mp_context=None,
+        preload: bool | None = None,
+    ):
+        self.processes = processes or os.cpu_count() or 1
+        self.target_seconds = target_seconds
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        options = dict(
+            lexicon_path=lexicon_path,
+            templates_path=templates_path,
+            use_snapshot=use_snapshot,
+            dict_dir=dict_dir,
+            cache_size=cache_size,
+            tokenizer=tokenizer,
+        )
+        self._options = options
+        self._mp_context = mp_context
+        # 默认 fork 的时候才预先加载；spawn、forkserver 起的 worker 不继承父进程的内存，加载了也白加载
+        self.preload = (mp_context or multiprocessing.get_context()).get_start_method() == "fork" if preload is None else preload
+        self._reload_lock = threading.Lock()
+        self._executor = self._pool()
+
+    def _context(self):
+        context = self._mp_context or multiprocessing.get_context()
+        if context.get_start_method() == "fork" and threading.active_count() > 1:
+            # 有别的线程在跑的时候不能 fork：子进程可能继承一把别的线程拿着的锁（日志、stdout、cutword 里的），直接死锁，3.12 起还会警告。
+            # 旧池子的管理线程也算，所以第一个池子建好以后，reload 不管在哪个线程里调都走这里：换成 forkserver（没有的话 spawn），不预先加载
+            return multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+        return context
+
+    def _pool(self, start: bool = False) -> ProcessPoolExecutor:
+        """start 的话等 worker 都起来再返回；预先加载的时候总是要等的"""
+        context = self._context()
+        executor = ProcessPoolExecutor(self.processes, context, initializer=_init_worker, initargs=(self._options,))
+        if self.preload and context.get_start_method() == "fork":
+            global _worker, _preloaded
+            # 应用自己已经冻过（调过 cn2t.preload()）的话，冻住的东西归它管：这里既不冻也不解冻，免得把它冻的也放出来
+            freeze = gc.get_freeze_count() == 0
+            _worker, _preloaded = Parser(**self._options).warm(), self._options
+            if freeze:
+                gc.freeze()
+            try:
+                _start(executor, self.processes)  # 池子第一次交活的时候才 fork，趁 _worker 还是这一份赶紧把 worker 都 fork 出来
+            finally:
+                if freeze:
+                    gc.unfreeze()  # 只是为了 fork 的那一下，父进程自己的 GC 照常
+                _worker = _preloaded = None  # worker 都 fork 完了，父进程自己用不着这一份
+        elif start:
+            _start(executor, self.processes)
+        return executor
+
+    def map(self, texts: Iterable[str], base: datetime.datetime | None = None) -> Iterator:
+        """按输入顺序逐条吐结果，输入可以是生成器；同时在路上的块有上限，内存不会跟着输入涨"""
+        base = base or datetime.datetime.now()  # 整批共用一个基准时间
+        source = iter(texts)
+        pending: collections.deque[Future] = collections.deque()
+        chunk_size = self.min_chunk
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < self.processes * 2:
+                    chunk = [text for _, text in zip(range(chunk_size), source)]
+                    if not chunk:
+                        exhausted = True
+                        break
+                    pending.append(self._submit(_parse_chunk, chunk, base))
+                if not pending:
+                    return
+                results, elapsed = pending.popleft().result()
+                if elapsed > 0:
+                    rate = len(results) / elapsed
+                    chunk_size = max(self.min_chunk, min(self.max_chunk, int(rate * self.target_seconds)))
+                yield from results
+        finally:
+            # 中途不要了（break、异常）：没开始跑的块直接取消
+            for future in pending:
+                future.cancel()
+
+    def parse_many(self, texts: Iterable[str], base: datetime.datetime | None = None) -> list:
+        return list(self.map(texts, base))
+
+    def submit(self, texts: list[str], base: datetime.datetime | None = None) -> Future[list]:
+        """整块丢给一个 worker，返回 Future（给 aio 之类自己攒好批的用）"""
+        return self._submit(_parse_texts, texts, base)
+
+    def _submit(self, fn, *args) -> Future:
+        while True:
+            executor = self._executor
+            try:
+                return executor.submit(fn, *args)
+            except RuntimeError:
+                if executor is self._executor:
+                    raise  # 真的关掉了
+                # 拿到的是刚被 reload 换下来、已经 shutdown 的旧池子，换新的再交一次
+
+    def reload(self):
+        """开一个新的进程池（新 worker 启动的时候读新的词库），等 worker 都起来了再换上；
+        旧池子里已经交出去的块照常跑完再关，不会等它们，也不会打断它们。新 worker 起不来就抛异常，旧的接着用"""
+        with self._reload_lock:
+            executor = self._pool(start=True)  # 旧池子的管理线程还在，新池子是 forkserver 起的，每个 worker 自己读新的词库
+            old, self._executor = self._executor, executor
+        old.shutdown(wait=False)
+
+    def watch(self, interval: float = 1.0) -> Watcher:
+        paths = (self._options["lexicon_path"] or DEFAULT_LEXICON_PATH, self._options["templates_path"] or DEFAULT_TEMPLATES_PATH)
+        return Watcher(self, paths, interval).start()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> ParallelParser:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def parallel_parse(
+    texts: Iterable[str], base: datetime.datetime | None = None, processes: int | None = None, **options
+) -> Iterator:
+    """开一个临时的进程池解析完就关掉；要解析好几批的话自己建一个 ParallelParser 复用"""
+    with ParallelParser(processes, **options) as parser:
+        yield from parser.map(texts, base)
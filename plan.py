@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING, Any
+
+from .classes import Struct
+from .exprs import cdatum_fields, reads_datum
+from .result import CODE_OK, ParseResult
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# 同一句话（“下周二上午10点”“三天后”）要对着几百万个不同的基准时间算的时候用：
+# 分词到 second_parser 只做一遍，存成 Plan；之后每个基准时间只跑 third_parser 和 to_datetime。
+# 结果只跟基准时间的某几个字段有关（“下周二上午10点”只看日期，“三小时后”看到小时），
+# 所以一整个数组的基准时间先截到这个精度、去重，每个不同的值算一次，再用 numpy 按下标铺回去
+
+_UNITS = "Dhms"  # 日期、小时、分钟、秒，越往后越细
+_UNIT_OF_ID = {"HR": "h", "MI": "m", "SC": "s"}  # 世纪、年、月、周、日都只看日期
+_UNIT_OF_FIELD = {"hour": "h", "minute": "m", "second": "s"}
+
+
+def precision(structs: list[Struct]) -> str:
+    """结果最细依赖到基准时间的哪一位（numpy 的 datetime64 单位）"""
+    unit = "D"  # 年月日缺了会拿基准日期补，所以日期总是要看的
+    for struct in structs:
+        body = struct.body
+        if body is None or body.mod is None:
+            continue
+        if struct.meta is not None and struct.meta.ID is not None:
+            if body.val is None or any(isinstance(mod, str) and reads_datum(mod) for mod in body.mod):
+                unit = max(unit, _UNIT_OF_ID.get(struct.meta.ID, "D"), key=_UNITS.index)
+        for mod in body.mod:
+            if isinstance(mod, str):
+                if (fields := cdatum_fields(mod)) is None:
+                    return "s"  # 看不出来读了什么，只能按秒算
+                for field in fields:
+                    unit = max(unit, _UNIT_OF_FIELD.get(field, "D"), key=_UNITS.index)
+    return unit
+
+
+class Plan:
+    # Parser.compile(text) 建；只读，可以在线程之间共享
+    __slots__ = ("text", "structs", "failure", "relative", "unit")
+
+    def __init__(self, text: str, structs: list[Struct] | None, failure: ParseResult | None, relative: bool):
+        self.text = text
+        self.structs = structs  # second_parser 的输出，每次算之前拷一份，自己不会被改
+        self.failure = failure  # 分词到 second_parser 就失败了（比如有不认识的词），跟基准时间无关
+        self.relative = relative
+        self.unit = precision(structs) if structs is not None and relative else "D"
+
+    def at(self, base: datetime.datetime) -> ParseResult:
+        """对一个基准时间算，和 parse_result(text, base) 的结果一样"""
+        if self.failure is not None:
+            return self.failure
+        from . import _failure, third_parser, to_datetime  # 包里的函数，导入的时候还没定义
+
+        assert self.structs is not None
+        stage = "third_parser"
+        try:
+            merged = third_parser([struct.copy() for struct in self.structs], base)
+            stage = "to_datetime"
+            return ParseResult(*to_datetime(*merged, now=base))
+        except Exception as e:
+            return _failure(e, stage, self.text)
+
+    def evaluate(self, bases: Any) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """bases 是一串基准时间（datetime64 数组、datetime 列表都行），返回 (开始, 结束, 结果码) 三个数组；
+        开始、结束是 datetime64[s]，失败的是 NaT；结果码是 int8，成功是 CODE_OK，失败是 -1~-4 或者 0（意料之外的异常）"""
+        import numpy as np
+
+        bases = np.asarray(bases, dtype="datetime64[s]")
+        if not self.relative or self.failure is not None:
+            # 跟基准时间无关，算一次铺满
+            result = self.at(datetime.datetime(2000, 1, 1))
+            return _fill(np, result, bases.shape)
+        keys, inverse = np.unique(bases.astype(f"datetime64[{self.unit}]"), return_inverse=True)
+        starts = np.full(keys.shape, np.datetime64("NaT"), dtype="datetime64[s]")
+        ends = starts.copy()
+        codes = np.full(keys.shape, CODE_OK, dtype=np.int8)
+        for i, key in enumerate(keys.astype("datetime64[s]")):
+            base = key.item()
+            if not isinstance(base, datetime.datetime):
+                codes[i] = -1 if base is None else -3  # NaT 当无效时间，超出 datetime 范围当溢出
+                continue
+            result = self.at(base)
+            if result.code is None:
+                starts[i], ends[i] = result.start, result.end
+            else:
+                codes[i] = result.code
+        return starts[inverse].reshape(bases.shape), ends[inverse].reshape(bases.shape), codes[inverse].reshape(bases.shape)
+
+    def __repr__(self) -> str:
+        kind = "failed" if self.failure is not None else f"relative, unit={self.unit}" if self.relative else "absolute"
+        return f"Plan({self.text!r}, {kind})"
+
+
+def _fill(np, result: ParseResult, shape: tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if result.code is not None:
+        nat = np.full(shape, np.datetime64("NaT"), dtype="datetime64[s]")
+        return nat, nat.copy(), np.full(shape, result.code, dtype=np.int8)
+    return (
+        np.full(shape, np.datetime64(result.start, "s")),
+        np.full(shape, np.datetime64(result.end, "s")),
+        np.full(shape, CODE_OK, dtype=np.int8),
+    )
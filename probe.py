@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+from .log import logger
+from .result import ParseResult
+
+# 可选的埋点：每个阶段多久、second_parser 试了几次模板、匹配上几次、MOD/RAW 求值几次、分出来几个词。
+# 默认不开，不开的时候每个阶段只多一次 `is not None`；开了也可以只抽一部分请求（sample=0.01）
+
+STAGES = ("cutword", "run_merge_num", "add_tag", "first_parser", "second_parser", "third_parser", "to_datetime")
+
+
+class _RawCounter(threading.local):
+    evals = 0
+
+
+raw_counter = _RawCounter()  # 开了埋点的时候 matcher 里 RAW 表达式每求值一次加一（不开的时候用的是不计数的检查）；每个线程一份，单次调用前后一减就是这次的
+
+
+class Trace:
+    # 一次解析的记录，解析完交给回调
+    __slots__ = ("text", "stages", "tokens", "attempts", "matches", "mod_evals", "raw_evals", "cache", "result", "total", "_start", "_last", "_raw")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.stages: dict[str, int] = {}  # 阶段 -> 纳秒；命中缓存的时候前面几个阶段就没有
+        self.tokens = 0  # 合并完数字之后的词数
+        self.attempts = self.matches = self.mod_evals = self.raw_evals = 0
+        self.cache = "off"  # off / miss / hit / relative
+        self.result: ParseResult | None = None
+        self.total = 0  # 纳秒，从开始到结束，包括查缓存
+        self._raw = raw_counter.evals
+        self._start = self._last = time.perf_counter_ns()
+
+    def lap(self, stage: str):
+        now = time.perf_counter_ns()
+        self.stages[stage] = now - self._last
+        self._last = now
+
+    def mark(self):
+        """从这里开始算下一个阶段（中间的杂事不算进任何阶段）"""
+        self._last = time.perf_counter_ns()
+
+    def finish(self, result: ParseResult) -> Trace:
+        self.result = result
+        self.raw_evals = raw_counter.evals - self._raw
+        self.total = time.perf_counter_ns() - self._start
+        return self
+
+    def __repr__(self) -> str:
+        stages = " ".join(f"{stage}={ns / 1e3:.1f}us" for stage, ns in self.stages.items())
+        return (
+            f"Trace({self.text!r} {self.total / 1e3:.1f}us cache={self.cache} tokens={self.tokens} "
+            f"attempts={self.attempts} matches={self.matches} mods={self.mod_evals} raws={self.raw_evals} {stages})"
+        )
+
+
+class Instrumentation:
+    # 用法：parser = Parser(instrumentation=Instrumentation(sample=0.01, callback=print))；parser.instrumentation.snapshot()
+    def __init__(self, sample: float = 1.0, callback: Callable[[Trace], Any] | None = None):
+        self.sample = sample
+        self.callback = callback
+        self._lock = threading.Lock()
+        self.reset()
+
+    def start(self, text: str) -> Trace | None:
+        """这一条要不要记；要记就返回一个 Trace"""
+        if self.sample < 1.0 and random.random() >= self.sample:
+            return None
+        return Trace(text)
+
+    def record(self, trace: Trace):
+        with self._lock:
+            self.calls += 1
+            self.total_ns += trace.total
+            for stage, ns in trace.stages.items():
+                self.stage_ns[stage] += ns
+                self.stage_calls[stage] += 1
+            self.tokens += trace.tokens
+            self.attempts += trace.attempts
+            self.matches += trace.matches
+            self.mod_evals += trace.mod_evals
+            self.raw_evals += trace.raw_evals
+            self.cache[trace.cache] += 1
+            if (code := trace.result.code) is not None:
+                self.errors[code] += 1
+        if self.callback is not None:
+            try:
+                self.callback(trace)
+            except Exception:
+                logger.exception("埋点回调出错了")  # 回调自己出错不能影响解析；每次都出错的话走限流，不刷屏
+
+    def reset(self):
+        with self._lock:
+            self.calls = self.total_ns = self.tokens = 0
+            self.attempts = self.matches = self.mod_evals = self.raw_evals = 0
+            self.stage_ns: Counter[str] = Counter()
+            self.stage_calls: Counter[str] = Counter()
+            self.cache: Counter[str] = Counter()
+            self.errors: Counter[int] = Counter()  # 错误码 -> 次数，0 是没预料到的异常
+
+    def snapshot(self) -> dict[str, Any]:
+        """到目前为止（只算抽到的）的累计值"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "total_ns": self.total_ns,
+                "stages": {stage: {"calls": self.stage_calls[stage], "ns": self.stage_ns[stage]} for stage in STAGES if self.stage_calls[stage]},
+                "tokens": self.tokens,
+                "template_attempts": self.attempts,
+                "template_matches": self.matches,
+                "mod_evals": self.mod_evals,
+                "raw_evals": self.raw_evals,
+                "cache": dict(self.cache),
+                "errors": dict(self.errors),
+            }
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import datetime
+from typing import Literal
+
+# full_parse 的返回值是 (开始, 结束) / -1~-4 / None，老接口不动；
+# 想知道是哪一步、哪个词出的错，用 parse_result 拿这个对象
+
+ERROR_KINDS: dict[int, str] = {
+    -1: "invalid",  # 时间不存在（2月30日、13月）
+    -2: "unknown_word",  # 有不认识的词
+    -3: "overflow",  # 超出 datetime 的范围
+    -4: "lunar_missing",  # 要算 1900~2100 以外的农历但是没装 lunarcalendar
+    0: "unexpected",  # 没预料到的异常（老接口返回 None）
+    -5: "nothing",  # 一个时间都没认出来（空字符串、“以后”）；full_parse 照旧返回 (datetime.min, datetime.min)，只有输出结果码的地方记成这个
+}
+
+CODE_OK = 1  # 结果码放进整数数组（Plan.evaluate）的时候成功记成这个；0 已经是“意料之外的异常”了
+
+
+class ParseResult:
+    __slots__ = ("start", "end", "code", "stage", "token", "message")
+
+    def __init__(
+        self,
+        start: datetime.datetime | None = None,
+        end: datetime.datetime | None = None,
+        code: Literal[-1, -2, -3, -4, 0] | None = None,
+        stage: str | None = None,
+        token: str | None = None,
+        message: str | None = None,
+    ):
+        self.start = start
+        self.end = end
+        self.code = code  # None 就是成功
+        self.stage = stage  # 出错的那一步：cutword、add_tag、first_parser……
+        self.token = token  # 出错的那个词（知道的话）
+        self.message = message
+
+    @classmethod
+    def failure(cls, code: Literal[-1, -2, -3, -4, 0], stage: str, token: str | None = None, message: str | None = None) -> ParseResult:
+        return cls(None, None, code, stage, token, message)
+
+    @property
+    def ok(self) -> bool:
+        return self.code is None
+
+    @property
+    def error(self) -> str | None:
+        return None if self.code is None else ERROR_KINDS[self.code]
+
+    @property
+    def value(self) -> tuple[datetime.datetime, datetime.datetime] | Literal[-1, -2, -3, -4] | None:
+        """老接口的返回值"""
+        if self.code is None:
+            return (self.start, self.end)  # type: ignore
+        return None if self.code == 0 else self.code
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ParseResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        if self.code is None:
+            return f"ParseResult({self.start!s} ~ {self.end!s})"
+        return f"ParseResult(error={self.error!r}, stage={self.stage!r}, token={self.token!r}, message={self.message!r})"
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import datetime
+import re
+from collections.abc import Iterator
+from typing import NamedTuple
+
+from .numeral import NUMERAL_CHARS
+from .trie import TrieTokenizer
+
+# 从长文本（聊天记录、文章）里把时间表达式抠出来。
+# 词库的字典树连同数字编成一个正则，C 里扫一遍整篇文档，找出“连着的一串词库词/数字”；
+# 这种串在正文里到处都是（“下”“点”“一”），所以还要像个时间才解析：
+# 有两个字以上的词（明天、下午、周一），或者数字后面跟着单位（3点、5号、2025年），或者至少两个分隔符（2025-08-15）。
+# 只有这些候选段会走完整的解析流程，总耗时跟文档长度成正比。
+# 空格也在词库里，“明天 后天”“2025-08-15 2025-08-16”会连成一串，所以串先按空白切成几段，是不是同一个表达式解析了再定
+
+MAX_SPAN = 64  # 再长就不可能是一个时间表达式了；超过的段按分隔符再切，切完还这么长的多半是一长串数字，跳过
+
+_WORDS = re.compile(r"\S+")
+_PUNCTUATION = re.compile(r"[^\W_]+")  # 太长的段按这个再切：字母、数字、汉字连着的算一截
+
+
+class Extracted(NamedTuple):
+    start: int  # 在原文里的字符下标，text[start:end] 就是这一段
+    end: int
+    text: str
+    result: tuple[datetime.datetime, datetime.datetime]
+
+
+class Scanner:
+    def __init__(self, lexicon: dict):
+        self.tokenizer = TrieTokenizer(lexicon.keys())
+        self.units: set[str] = set()  # 能跟在数字后面当单位的词
+        self.separators: set[str] = {" "}
+        self.anchors: set[str] = set()  # 自己就像个时间的词：明天、下午、周一、元旦；光秃秃的“小时”“星期”不算
+        for key, value in lexicon.items():
+            body = ((value.get("AS_WORD") or {}).get("BODY") or {}) if isinstance(value, dict) else {}
+            if (desc := body.get("DESC")) == "SEP":
+                self.separators.add(key)
+            elif desc is not None:
+                self.units.add(key)
+            if len(key) > 1 and (desc is None or "VAL" in body or "MOD" in body):
+                self.anchors.add(key)
+        digits = re.escape("".join(sorted(NUMERAL_CHARS)))
+        self.runs = re.compile(f"(?:[{digits}\\d]|{self.tokenizer.regex()})+")
+
+    def candidates(self, text: str) -> Iterator[list[tuple[int, int]]]:
+        """每个像时间的串按空白切成几段，返回这些段的 (start, end)，两头的标点（“日志:”的冒号）去掉；
+        哪几段合起来是一个表达式由调用的人解析了再定"""
+        for match in self.runs.finditer(text):
+            if not self.looks_like_time(match.group()):
+                continue
+            pieces = []
+            for word in _WORDS.finditer(text, *match.span()):
+                start, end = word.span()
+                for start, end in [(start, end)] if end - start <= MAX_SPAN else self._split(text, start, end):
+                    while start < end and not text[start].isalnum():
+                        start += 1
+                    while end > start and not text[end - 1].isalnum():
+                        end -= 1
+                    if 0 < end - start <= MAX_SPAN:
+                        pieces.append((start, end))
+            if pieces:
+                yield pieces
+
+    @staticmethod
+    def _split(text: str, start: int, end: int) -> Iterator[tuple[int, int]]:
+        for part in _PUNCTUATION.finditer(text, start, end):
+            yield part.span()
+
+    def shorter_ends(self, text: str, start: int, end: int) -> Iterator[int]:
+        """把末尾可能是多扫进来的词一个个去掉之后的结尾，从长到短：“今天天气”扫出来的“今天天”、“明天下雨”的“明天下”。
+        只看单字、又不是数字后面的单位的词（“3点”的“点”不算）；去掉之后解析结果变没变，由调用的人判断"""
+        tokens = self.tokenizer.cutword(text[start:end])
+        while len(tokens) > 1:
+            token, previous = tokens[-1], tokens[-2]
+            if len(token) > 1 or _numeral(token) or _numeral(previous) and token in self.units:
+                return
+            end -= len(token)
+            tokens.pop()
+            yield end
+
+    def looks_like_time(self, span: str) -> bool:
+        separators = 0
+        numeral = False
+        for token in self.tokenizer.cutword(span):
+            if _numeral(token):
+                numeral = True
+                continue
+            if token in self.separators:
+                separators += 1
+            elif token in self.anchors or numeral and token in self.units:
+                return True
+            numeral = False
+        return separators >= 2
+
+
+def _numeral(token: str) -> bool:
+    return token[0] in NUMERAL_CHARS or token[0].isdecimal()
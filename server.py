@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import collections
+import datetime
+import json
+import time
+from typing import Any
+
+from . import Parser, result_record
+from .aio import AsyncParser
+from .parallel import ParallelParser
+from .probe import Instrumentation
+from .result import ERROR_KINDS
+
+# 本地 HTTP 服务，只用标准库（asyncio）。别的语言的服务直接调它，不用各自再抄一份解析器
+#   POST /parse  {"text": "明天下午3点"} 或 {"texts": [...]}，可选 "base": "2025-08-15T12:00:00"
+#   GET  /metrics  Prometheus 文本格式：吞吐、延迟直方图、缓存命中率、各错误码计数
+#   POST /reload   重新读词库和模板，建好了再换上，正在解析的请求不受影响（--watch 的话文件一改自动做）
+# 同时到的请求会经过 AsyncParser 攒成一批解析
+
+MAX_BODY = 16 * 1024 * 1024
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error", 504: "Gateway Timeout"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests: collections.Counter[tuple[str, int]] = collections.Counter()  # (path, status)
+        self.texts = 0
+        self.errors: collections.Counter[int] = collections.Counter()
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # 最后一个是 +Inf
+        self.latency_sum = 0.0
+        self.latency_count = 0
+
+    def observe(self, path: str, status: int, seconds: float):
+        self.requests[path, status] += 1
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+        self.latency_count += 1
+
+    def count(self, results: list):
+        self.texts += len(results)
+        for result in results:
+            if (error := result_record(result)["error"]) is not None:
+                self.errors[error] += 1
+
+    def render(self, parser: Parser | ParallelParser) -> str:
+        uptime = time.monotonic() - self.started
+        lines = [
+            "# TYPE cn2t_uptime_seconds gauge",
+            f"cn2t_uptime_seconds {uptime:.3f}",
+            "# TYPE cn2t_requests_total counter",
+            *(f'cn2t_requests_total{{path="{path}",status="{status}"}} {n}' for (path, status), n in sorted(self.requests.items())),
+            "# TYPE cn2t_texts_total counter",
+            f"cn2t_texts_total {self.texts}",
+            "# TYPE cn2t_texts_per_second gauge",
+            f"cn2t_texts_per_second {self.texts / uptime if uptime else 0:.1f}",
+            "# TYPE cn2t_parse_errors_total counter",
+            *(f'cn2t_parse_errors_total{{code="{code}"}} {self.errors[code]}' for code in ERROR_KINDS),
+            "# TYPE cn2t_request_duration_seconds histogram",
+        ]
+        cumulative = 0
+        for bound, n in zip((*LATENCY_BUCKETS, "+Inf"), self.buckets):
+            cumulative += n
+            lines.append(f'cn2t_request_duration_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines += [f"cn2t_request_duration_seconds_sum {self.latency_sum:.6f}", f"cn2t_request_duration_seconds_count {self.latency_count}"]
+        if isinstance(parser, Parser) and (info := parser.cache_info()) is not None:
+            # 多进程的时候缓存在各个 worker 里，看不到
+            lookups = info.hits + info.misses
+            lines += [
+                "# TYPE cn2t_cache_hits_total counter",
+                f"cn2t_cache_hits_total {info.hits}",
+                "# TYPE cn2t_cache_misses_total counter",
+                f"cn2t_cache_misses_total {info.misses}",
+                "# TYPE cn2t_cache_evictions_total counter",
+                f"cn2t_cache_evictions_total {info.evictions}",
+                "# TYPE cn2t_cache_hit_ratio gauge",
+                f"cn2t_cache_hit_ratio {info.hits / lookups if lookups else 0:.4f}",
+            ]
+        if isinstance(parser, Parser) and (shape := parser.shape_info()) is not None:
+            lines += [
+                "# TYPE cn2t_shape_hits_total counter",
+                f"cn2t_shape_hits_total {shape.hits}",
+                "# TYPE cn2t_shape_misses_total counter",
+                f"cn2t_shape_misses_total {shape.misses}",
+                "# TYPE cn2t_shape_fallbacks_total counter",
+                f"cn2t_shape_fallbacks_total {shape.fallbacks}",
+            ]
+        if isinstance(parser, Parser) and (probe := parser.instrumentation) is not None:
+            # 开了埋点才有；抽样的话只算抽到的那些
+            snapshot = probe.snapshot()
+            lines += [
+                "# TYPE cn2t_traced_parses_total counter",
+                f"cn2t_traced_parses_total {snapshot['calls']}",
+                "# TYPE cn2t_stage_seconds_total counter",
+                *(f'cn2t_stage_seconds_total{{stage="{stage}"}} {row["ns"] / 1e9:.6f}' for stage, row in snapshot["stages"].items()),
+            ]
+            for name in ("tokens", "template_attempts", "template_matches", "mod_evals", "raw_evals"):
+                lines += [f"# TYPE cn2t_{name}_total counter", f"cn2t_{name}_total {snapshot[name]}"]
+        return "\n".join(lines) + "\n"
+
+
+class Server:
+    def __init__(self, parser: Parser | ParallelParser | None = None, *, timeout: float | None = 10.0, **options):
+        self.parser = parser or Parser()
+        self.aio = AsyncParser(self.parser, timeout=timeout, **options)
+        self.metrics = Metrics()
+
+    async def handle_parse(self, body: bytes) -> dict:
+        try:
+            payload = json.loads(body)
+        except ValueError as e:
+            raise HTTPError(400, f"invalid json: {e}") from None
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "body must be a json object")
+        base = payload.get("base")
+        try:
+            base = datetime.datetime.fromisoformat(base) if base is not None else None
+        except (TypeError, ValueError):
+            raise HTTPError(400, f"invalid base: {base!r}") from None
+        try:
+            if isinstance(text := payload.get("text"), str):
+                results = [await self.aio.parse(text, base)]
+                response: dict[str, Any] = {"text": text, **result_record(results[0])}
+            elif isinstance(texts := payload.get("texts"), list) and all(isinstance(t, str) for t in texts):
+                results = await self.aio.parse_many(texts, base)
+                response = {"results": [{"text": t, **result_record(r)} for t, r in zip(texts, results)]}
+            else:
+                raise HTTPError(400, 'expected "text": str or "texts": [str]')
+        except TimeoutError:
+            raise HTTPError(504, "parse timed out") from None
+        self.metrics.count(results)
+        return response
+
+    async def respond(self, method: str, path: str, body: bytes) -> tuple[int, str, bytes]:
+        if path == "/parse":
+            if method != "POST":
+                raise HTTPError(405, "use POST")
+            return 200, "application/json", json.dumps(await self.handle_parse(body), ensure_ascii=False).encode()
+        if path == "/reload":
+            if method != "POST":
+                raise HTTPError(405, "use POST")
+            start = time.perf_counter()
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.parser.reload)  # 在线程里建，不卡事件循环
+            except Exception as e:
+                raise HTTPError(500, f"reload failed: {e}") from None
+            return 200, "application/json", json.dumps({"reloaded": True, "seconds": round(time.perf_counter() - start, 3)}).encode()
+        if path == "/metrics":
+            return 200, "text/plain; version=0.0.4", self.metrics.render(self.parser).encode()
+        raise HTTPError(404, "not found")
+
+    async def connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:  # keep-alive，一个连接上可以发好多个请求
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        return
+                    method, target, version = request_line.decode("latin-1").split()
+                    headers = {}
+                    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                except (ValueError, asyncio.LimitOverrunError):
+                    return  # 不是 HTTP，直接断
+                start = time.perf_counter()
+                path = target.split("?", 1)[0]
+                raw_length = headers.get("content-length") or "0"
+                unread = True  # 请求体没读，连接上的数据已经对不齐了，回完就断
+                try:
+                    if not raw_length.isdigit():
+                        raise HTTPError(400, "invalid content-length")
+                    if (length := int(raw_length)) > MAX_BODY:
+                        raise HTTPError(413, "body too large")
+                    body = await reader.readexactly(length) if length else b""
+                    unread = False
+                    status, content_type, payload = await self.respond(method, path, body)
+                except HTTPError as e:
+                    status, content_type = e.status, "application/json"
+                    payload = json.dumps({"error": str(e)}).encode()
+                keep_alive = not unread and headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+                self.metrics.observe(path if path in ("/parse", "/metrics", "/reload") else "other", status, time.perf_counter() - start)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000, ready: asyncio.Future | None = None):
+        if isinstance(self.parser, Parser):
+            self.parser.warm()
+        server = await asyncio.start_server(self.connection, host, port)
+        if ready is not None:
+            ready.set_result(server.sockets[0].getsockname()[1])  # port=0 的时候告诉调用方实际端口
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.aio.aclose()
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(prog="python -m cn2t.server", description="中文时间解析 HTTP 服务")
+    ap.add_argument("--host", default="127.0.0.1", help="默认只听本机")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("-j", "--processes", type=int, default=1, help="开几个进程解析（默认 1，在线程里跑）")
+    ap.add_argument("--timeout", type=float, default=10.0, help="单次解析超时秒数")
+    ap.add_argument("--window", type=float, default=0.001, help="攒批的时间窗口秒数")
+    ap.add_argument("--tokenizer", choices=("cutword", "trie"), default="cutword", help="分词器（默认 cutword）")
+    ap.add_argument("--sample", type=float, default=0.0, help="抽多少比例的请求埋点，分阶段耗时等计数会出现在 /metrics 里（默认 0，不开；只支持单进程）")
+    ap.add_argument("--watch", type=float, default=0.0, metavar="SECONDS", help="每隔几秒看一眼词库和模板文件，改了就自动重新加载（默认 0，不看）")
+    args = ap.parse_args(argv)
+    if args.processes > 1:
+        parser: Parser | ParallelParser = ParallelParser(args.processes, tokenizer=args.tokenizer)
+    else:
+        parser = Parser(tokenizer=args.tokenizer, instrumentation=Instrumentation(args.sample) if args.sample > 0 else None)
+    watcher = parser.watch(args.watch) if args.watch > 0 else None
+    print(f"cn2t serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(Server(parser, timeout=args.timeout, window=args.window).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        if isinstance(parser, ParallelParser):
+            parser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from typing import Any
+
+import yaml
+
+# 快照格式变了就把这个加一，旧快照会自动失效
+SNAPSHOT_VERSION = 1
+
+_MISSING = object()
+
+
+def snapshot_path(path: str) -> str:
+    # 和 .pyc 一样放在同目录的 __pycache__ 里
+    path = os.path.abspath(path)
+    return os.path.join(os.path.dirname(path), "__pycache__", f"{os.path.basename(path)}.cn2t-{SNAPSHOT_VERSION}.pickle")
+
+
+def cache_dir() -> str | None:
+    """当前用户自己的缓存目录（$XDG_CACHE_HOME/cn2t，Windows 上是 %LOCALAPPDATA%/cn2t），建不了或者不安全就是 None。
+    不能用公共的临时目录：别的用户可以抢先在那里放一个同名的文件，读快照的时候 pickle.load 就是在跑别人的代码"""
+    if os.name == "nt":
+        root = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    path = os.path.join(root, "cn2t")
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        if not _trusted(os.stat(path)):
+            return None
+    except OSError:
+        return None
+    return path
+
+
+def _trusted(stat: os.stat_result) -> bool:
+    # 和 ssh 查 authorized_keys 一样：得是自己（或者 root）的，而且别人写不了。Windows 上没有这一套，靠的是目录本身是每个用户一份
+    if os.name == "nt":
+        return True
+    return stat.st_uid in (os.getuid(), 0) and not stat.st_mode & 0o022
+
+
+def _fallback_path(path: str) -> str | None:
+    # 包目录不可写（比如装在系统目录里）的时候退到用户自己的缓存目录
+    if (directory := cache_dir()) is None:
+        return None
+    digest = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(directory, f"{digest}-{os.path.basename(path)}.cn2t-{SNAPSHOT_VERSION}.pickle")
+
+
+def _read(snap: str, path: str, stat: os.stat_result) -> Any:
+    try:
+        with open(snap, "rb") as f:
+            if not _trusted(os.fstat(f.fileno())):
+                return _MISSING  # 别人放的、或者别人改得了的，不 unpickle
+            version, mtime_ns, size, digest = pickle.load(f)
+            if version != SNAPSHOT_VERSION or size != stat.st_size:
+                return _MISSING
+            if mtime_ns == stat.st_mtime_ns:
+                return pickle.load(f)
+            # mtime 对不上不一定是改过了（git checkout、拷贝之类），再比一下哈希
+            with open(path, "rb") as src:
+                if hashlib.sha256(src.read()).hexdigest() != digest:
+                    return _MISSING
+            data = pickle.load(f)
+    except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+        return _MISSING
+    _write(snap, stat, digest, data)  # 记下新的 mtime，下次不用再算哈希
+    return data
+
+
+def _write(snap: str, stat: os.stat_result, digest: str, data: Any) -> bool:
+    try:
+        os.makedirs(os.path.dirname(snap), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(snap), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((SNAPSHOT_VERSION, stat.st_mtime_ns, stat.st_size, digest), f, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, snap)  # 原子替换，并发的进程读到的要么是旧的要么是新的
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        return False
+    return True
+
+
+def compile_snapshot(path: str) -> Any:
+    """解析 yaml 并写出快照，返回解析结果"""
+    # 先 stat 再读：中间被改了的话，快照记的是旧的 mtime，下次对不上会再比一次哈希，而不是拿新的 mtime 盖住旧内容
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = yaml.safe_load(raw.decode("utf-8"))
+    digest = hashlib.sha256(raw).hexdigest()
+    if not _write(snapshot_path(path), stat, digest, data) and (fallback := _fallback_path(path)) is not None:
+        _write(fallback, stat, digest, data)
+    return data
+
+
+def load_yaml(path: str, use_snapshot: bool = True) -> Any:
+    """读 yaml；有新鲜的快照就直接读快照，否则解析 yaml 并顺手更新快照"""
+    if not use_snapshot:
+        with open(path, encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    stat = os.stat(path)
+    for snap in (snapshot_path(path), _fallback_path(path)):
+        if snap is None:
+            continue
+        data = _read(snap, path, stat)
+        if data is not _MISSING:
+            return data
+    return compile_snapshot(path)
+
+
+if __name__ == "__main__":
+    # python -m cn2t.snapshot [yaml文件...]：部署的时候预先编译好，省得第一个进程现编
+    targets = sys.argv[1:] or [
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), name) for name in ("lexicon.yml", "templates.yaml")
+    ]
+    for target in targets:
+        compile_snapshot(target)
+        print(f"{target} -> {snapshot_path(target)}")
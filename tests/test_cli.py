@@ -0,0 +1,37 @@
+# python -m cn2t：坏行占位输出、列名写错直接退出
+import json
+
+from cn2t.__main__ import BAD_ROW, main
+
+BASE = "2025-08-20T12:00:00"
+
+
+def run(capsys, *argv):
+    status = main(["--tokenizer", "trie", "-b", BASE, *argv])
+    out, err = capsys.readouterr()
+    return status, [json.loads(line) for line in out.splitlines()], err
+
+
+def test_bad_jsonl_rows_keep_their_place(tmp_path, capsys):
+    path = tmp_path / "in.jsonl"
+    path.write_text('{"text": "明天"}\n{bad\n[1, 2]\n{"other": 1}\n{"text": "后天"}\n', encoding="utf-8")
+    status, rows, err = run(capsys, str(path))
+    assert status == 0
+    assert [row["error"] for row in rows] == [None, BAD_ROW, BAD_ROW, BAD_ROW, None]
+    assert rows[1]["text"] == "{bad"
+    assert f"{BAD_ROW}: 3" in err
+
+
+def test_missing_jsonl_column(tmp_path, capsys):
+    path = tmp_path / "in.jsonl"
+    path.write_text('{"txt": "明天"}\n', encoding="utf-8")
+    status, rows, err = run(capsys, str(path))
+    assert status == 2 and rows == [] and "'text'" in err
+
+
+def test_missing_csv_column(tmp_path, capsys):
+    path = tmp_path / "in.csv"
+    path.write_text("created_at\n明天\n", encoding="utf-8")
+    assert run(capsys, str(path))[0] == 2
+    status, rows, _ = run(capsys, str(path), "-c", "created_at")
+    assert status == 0 and rows[0]["start"] == "2025-08-21T00:00:00"
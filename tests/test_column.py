@@ -0,0 +1,21 @@
+# parse_column 一整列的结果要和逐条 parse 对得上；啥也没认出来的、缺失的都是 NaT
+import datetime
+
+import pytest
+
+from cn2t import NOTHING_FOUND, Parser
+from cn2t.column import MISSING_CODE
+
+np = pytest.importorskip("numpy")
+
+BASE = datetime.datetime(2025, 8, 20, 12)
+
+
+def test_parse_column():
+    parser = Parser()
+    texts = ["明天", "", "以后", None, "2025年2月30日", "明天", "去上海"]
+    starts, ends, codes = parser.parse_column(texts, base=BASE)
+    assert codes.tolist() == [1, NOTHING_FOUND, NOTHING_FOUND, MISSING_CODE, -1, 1, -2]
+    assert starts[0].item() == starts[5].item() == datetime.datetime(2025, 8, 21)
+    assert ends[0].item() == datetime.datetime(2025, 8, 21, 23, 59, 59)
+    assert np.isnat(starts[1:5]).all() and np.isnat(ends[1:5]).all()
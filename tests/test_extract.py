@@ -0,0 +1,50 @@
+# extract 从长文本里切表达式：空格隔开的几个表达式要分开，两头的标点不算，太长的串切开而不是整个丢掉
+import datetime
+
+import pytest
+
+from cn2t import Parser
+
+dt = datetime.datetime
+BASE = dt(2025, 8, 20, 12)
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return Parser()
+
+
+def spans(parser, text):
+    return [found.text for found in parser.extract(text, base=BASE)]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("明天 后天", ["明天", "后天"]),
+        ("日志: 2025-08-15 2025-08-16 结束", ["2025-08-15", "2025-08-16"]),
+        ("12:30 14:00", ["12:30", "14:00"]),
+        ("明天下午3点 后天上午", ["明天下午3点", "后天上午"]),
+        ("会议定在2025年8月16日 14:30:45，记得", ["2025年8月16日 14:30:45"]),
+        ("8月16日 凌晨3:20", ["8月16日 凌晨3:20"]),
+        ("2025/8/16 PM 3:45", ["2025/8/16 PM 3:45"]),
+        ("今天天气不错", ["今天"]),
+        ("6小时前有人来过", ["6小时前"]),
+    ],
+)
+def test_spans(parser, text, expected):
+    assert spans(parser, text) == expected
+
+
+def test_adjacent_days(parser):
+    assert [found.result[0] for found in parser.extract("明天 后天", base=BASE)] == [dt(2025, 8, 21), dt(2025, 8, 22)]
+
+
+@pytest.mark.parametrize("separator", [" ", "/"])
+def test_long_run(parser, separator):
+    dates = [f"2025-08-{day:02}" for day in range(10, 16)]
+    text = separator.join(dates)
+    assert len(text) > 64
+    found = parser.extract(text, base=BASE)
+    assert [item.text for item in found] == dates
+    assert all(text[item.start : item.end] == item.text for item in found)
@@ -0,0 +1,32 @@
+# 自带的农历表和 lunarcalendar 逐日比：1900~2100 年每一个农历日期（含闰月）换出来的公历一样，不存在的日期都报错
+import pytest
+
+from cn2t.lunar import FIRST_YEAR, LAST_YEAR, lunar_to_solar
+
+lunarcalendar = pytest.importorskip("lunarcalendar")
+
+
+def reference(year, month, day, leap):
+    try:
+        return lunarcalendar.Lunar(year, month, day, leap).to_date()
+    except lunarcalendar.DateNotExist:
+        return None
+
+
+def ours(year, month, day, leap):
+    try:
+        return lunar_to_solar(year, month, day, leap)
+    except ValueError:
+        return None
+
+
+@pytest.mark.parametrize("year", range(FIRST_YEAR, LAST_YEAR + 1))
+def test_table_matches_lunarcalendar(year):
+    diff = [
+        (month, day, leap)
+        for month in range(1, 13)
+        for leap in (False, True)
+        for day in range(1, 31)
+        if ours(year, month, day, leap) != reference(year, month, day, leap)
+    ]
+    assert diff == []
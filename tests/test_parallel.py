@@ -0,0 +1,35 @@
+# ParallelParser 预先加载时的 gc.freeze()：只解冻自己冻的，应用 preload() 冻的不动
+import datetime
+import gc
+import multiprocessing
+
+import pytest
+
+import cn2t
+from cn2t.parallel import ParallelParser
+
+pytestmark = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="要 fork")
+
+BASE = datetime.datetime(2025, 8, 20, 12)
+
+
+def pool():
+    return ParallelParser(1, tokenizer="trie", mp_context=multiprocessing.get_context("fork"), preload=True)
+
+
+def test_unfreezes_its_own_freeze():
+    assert gc.get_freeze_count() == 0
+    with pool() as parser:
+        assert gc.get_freeze_count() == 0
+        assert parser.parse_many(["明天"], BASE) == [(datetime.datetime(2025, 8, 21), datetime.datetime(2025, 8, 21, 23, 59, 59))]
+
+
+def test_keeps_the_app_freeze():
+    cn2t.preload(cn2t.Parser(tokenizer="trie"))
+    try:
+        frozen = gc.get_freeze_count()
+        assert frozen > 0
+        with pool():
+            assert gc.get_freeze_count() == frozen
+    finally:
+        gc.unfreeze()
@@ -0,0 +1,27 @@
+# 对外输出的结果（命令行、HTTP 用的 result_record）：啥也没认出来的不能报成 0001-01-01
+import datetime
+
+import pytest
+
+from cn2t import NOTHING_FOUND, Parser, result_record
+
+BASE = datetime.datetime(2025, 8, 20, 12)
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return Parser()
+
+
+@pytest.mark.parametrize("text", ["", "以后"])
+def test_nothing_is_an_error(parser, text):
+    assert result_record(parser.parse(text, base=BASE)) == {"start": None, "end": None, "error": NOTHING_FOUND}
+
+
+def test_first_day_is_still_a_date(parser):
+    assert result_record(parser.parse("0001年1月1日", base=BASE)) == {"start": "0001-01-01T00:00:00", "end": "0001-01-01T23:59:59", "error": None}
+
+
+def test_failures():
+    assert result_record(-1) == {"start": None, "end": None, "error": -1}
+    assert result_record(None)["error"] == 0
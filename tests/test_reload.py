@@ -0,0 +1,30 @@
+# 第一次加载和 reload 撞在一起：最后留下的必须是 reload 建的那个 Engine
+import threading
+import time
+import types
+
+import cn2t
+from cn2t import Parser
+
+
+def test_first_load_does_not_overwrite_reload(monkeypatch):
+    loaded = []
+    started = threading.Event()
+
+    def load(*args):
+        first = not loaded
+        engine = types.SimpleNamespace()
+        loaded.append(engine)
+        if first:
+            started.set()
+            time.sleep(0.2)  # 第一次加载慢，reload 在这期间进来
+        return engine
+
+    monkeypatch.setattr(cn2t.Engine, "load", staticmethod(load))
+    parser = Parser()
+    thread = threading.Thread(target=lambda: parser.engine)
+    thread.start()
+    started.wait()
+    reloaded = parser.reload()
+    thread.join()
+    assert parser.engine is reloaded is loaded[-1]
@@ -0,0 +1,129 @@
+# to_datetime 改成按年月日直接建以后（user-021）和以前链式 relativedelta 的结果比，基准时间 2025-08-20 12:00
+# BASELINE 是改之前那一版跑出来的原样输出，FIXED 是故意改掉的：月底错位（1月31日算成2月3日）、0001年和9999年的边界、13月和2月30日不再报成别的日子、
+# 还有“N天后”以前差一天（按下个月的天数进位）
+import datetime
+
+import pytest
+
+from cn2t import Parser
+
+dt = datetime.datetime
+BASE = dt(2025, 8, 20, 12)
+
+BASELINE = {
+    '2025年8月15日': (dt(2025, 8, 15, 0, 0), dt(2025, 8, 15, 23, 59, 59)),
+    '贰零贰伍年捌月拾伍日': (dt(2025, 8, 15, 0, 0), dt(2025, 8, 15, 23, 59, 59)),
+    '二〇二五年八月十五日': (dt(2025, 8, 15, 0, 0), dt(2025, 8, 15, 23, 59, 59)),
+    '2025/08/15': (dt(2025, 8, 15, 0, 0), dt(2025, 8, 15, 23, 59, 59)),
+    '2025年8月16日 14:30:45': (dt(2025, 8, 16, 14, 30, 45), dt(2025, 8, 16, 14, 30, 45)),
+    '2025-08-16 18:15:00': (dt(2025, 8, 16, 18, 15), dt(2025, 8, 16, 18, 15)),
+    '2025/08/16 23:59:59': (dt(2025, 8, 16, 23, 59, 59), dt(2025, 8, 16, 23, 59, 59)),
+    '二〇二五年八月十六日 下午三点半': (dt(2025, 8, 16, 15, 30), dt(2025, 8, 16, 15, 30, 59)),
+    '二零二五年八月十六号 中午12点整': (dt(2025, 8, 16, 12, 0), dt(2025, 8, 16, 12, 0, 59)),
+    '二五年8月16日 午夜12点': (dt(2025, 8, 17, 0, 0), dt(2025, 8, 17, 0, 59, 59)),
+    '2025年8月16日 上午9时15分': (dt(2025, 8, 16, 9, 15), dt(2025, 8, 16, 9, 15, 59)),
+    '2025-08-16 下午11:08': (dt(2025, 8, 16, 23, 8), dt(2025, 8, 16, 23, 8, 59)),
+    '8月16日 凌晨3:20': (dt(2025, 8, 16, 3, 20), dt(2025, 8, 16, 3, 20, 59)),
+    '8月16日 14:00': (dt(2025, 8, 16, 14, 0), dt(2025, 8, 16, 14, 0, 59)),
+    '十二月三十一日 18:00': (dt(2025, 12, 31, 18, 0), dt(2025, 12, 31, 18, 0, 59)),
+    '02月15日 09:30:00': (dt(2025, 2, 15, 9, 30), dt(2025, 2, 15, 9, 30)),
+    '16号晚上8点': (dt(2025, 8, 16, 20, 0), dt(2025, 8, 16, 20, 59, 59)),
+    '01日 15:30': (dt(2025, 8, 1, 15, 30), dt(2025, 8, 1, 15, 30, 59)),
+    '31日下午4点半': (dt(2025, 9, 1, 16, 30), dt(2025, 9, 1, 16, 30, 59)),
+    '下午4点': (dt(2025, 8, 20, 16, 0), dt(2025, 8, 20, 16, 59, 59)),
+    '上午10:15': (dt(2025, 8, 20, 10, 15), dt(2025, 8, 20, 10, 15, 59)),
+    '23:45:30': (dt(2025, 8, 20, 23, 45, 30), dt(2025, 8, 20, 23, 45, 30)),
+    '今天': (dt(2025, 8, 20, 0, 0), dt(2025, 8, 20, 23, 59, 59)),
+    '明天凌晨': (dt(2025, 8, 21, 0, 0), dt(2025, 8, 21, 4, 59, 59)),
+    '昨天中午': (dt(2025, 8, 19, 12, 0), dt(2025, 8, 19, 12, 59, 59)),
+    '三天后': (dt(2025, 8, 23, 0, 0), dt(2025, 8, 23, 23, 59, 59)),
+    '两周前': (dt(2025, 8, 6, 0, 0), dt(2025, 8, 6, 23, 59, 59)),
+    '下个月5号': (dt(2025, 9, 5, 0, 0), dt(2025, 9, 5, 23, 59, 59)),
+    '下周二': (dt(2025, 8, 26, 0, 0), dt(2025, 8, 26, 23, 59, 59)),
+    '上周三上午10点': (dt(2025, 8, 13, 10, 0), dt(2025, 8, 13, 10, 59, 59)),
+    '公历2025年8月16日': (dt(2025, 8, 16, 0, 0), dt(2025, 8, 16, 23, 59, 59)),
+    '2025年8月': (dt(2025, 8, 1, 0, 0), dt(2025, 8, 31, 23, 59, 59)),
+    '8月': (dt(2025, 8, 1, 0, 0), dt(2025, 8, 31, 23, 59, 59)),
+    '2025/8/16 PM 3:45': (dt(2025, 8, 16, 15, 45), dt(2025, 8, 16, 15, 45, 59)),
+    '0001年1月1日': (dt(1, 1, 1, 0, 0), dt(1, 1, 1, 0, 0)),
+    '9999年12月31日 23:59:59': -1,
+    '2024年2月29日': (dt(2024, 2, 28, 0, 0), dt(2024, 2, 28, 23, 59, 59)),
+    '2025年13月1日': (dt(2026, 1, 1, 0, 0), dt(2026, 1, 1, 23, 59, 59)),
+    '2025年2月30日': (dt(2025, 2, 27, 0, 0), dt(2025, 2, 27, 23, 59, 59)),
+    '昨天25点': (dt(2025, 8, 20, 1, 0), dt(2025, 8, 20, 1, 59, 59)),
+    '2025年农历八月十六': (dt(2025, 10, 7, 0, 0), dt(2025, 10, 7, 23, 59, 59)),
+    '无效时间格式': -2,
+    '2025年8月32日': (dt(2025, 9, 2, 0, 0), dt(2025, 9, 2, 23, 59, 59)),
+    '嘉靖十五年': (dt(1536, 1, 1, 0, 0), dt(1536, 12, 31, 23, 59, 59)),
+    '2023年10月1日': (dt(2023, 10, 1, 0, 0), dt(2023, 10, 1, 23, 59, 59)),
+    '2024-05-20': (dt(2024, 5, 20, 0, 0), dt(2024, 5, 20, 23, 59, 59)),
+    '2025年元旦': (dt(2025, 1, 1, 0, 0), dt(2025, 1, 1, 23, 59, 59)),
+    '2022/12/31 18:30': (dt(2022, 12, 31, 18, 30), dt(2022, 12, 31, 18, 30, 59)),
+    '2026年农历正月初一': (dt(2026, 2, 17, 0, 0), dt(2026, 2, 17, 23, 59, 59)),
+    '明天下午3点': (dt(2025, 8, 21, 15, 0), dt(2025, 8, 21, 15, 59, 59)),
+    '大后天晚上': (dt(2025, 8, 23, 17, 0), dt(2025, 8, 23, 22, 59, 59)),
+    '昨天上午9点': (dt(2025, 8, 19, 9, 0), dt(2025, 8, 19, 9, 59, 59)),
+    '上周三': (dt(2025, 8, 13, 0, 0), dt(2025, 8, 13, 23, 59, 59)),
+    '明年春节': (dt(2026, 2, 17, 0, 0), dt(2026, 2, 17, 23, 59, 59)),
+    '3天后': (dt(2025, 8, 23, 0, 0), dt(2025, 8, 23, 23, 59, 59)),
+    '1小时30分钟后': (dt(2025, 8, 20, 13, 30), dt(2025, 8, 20, 13, 30, 59)),
+    '32天后': (dt(2025, 9, 22, 0, 0), dt(2025, 9, 22, 23, 59, 59)),
+    '40天后': (dt(2025, 9, 30, 0, 0), dt(2025, 9, 30, 23, 59, 59)),
+    '100天后': (dt(2025, 11, 29, 0, 0), dt(2025, 11, 29, 23, 59, 59)),
+    '45天前': (dt(2025, 7, 7, 0, 0), dt(2025, 7, 7, 23, 59, 59)),
+    '60天前': (dt(2025, 6, 21, 0, 0), dt(2025, 6, 21, 23, 59, 59)),
+    '365天后': (dt(2026, 8, 20, 0, 0), dt(2026, 8, 20, 23, 59, 59)),
+    '10周后': (dt(2025, 10, 29, 0, 0), dt(2025, 10, 29, 23, 59, 59)),
+    '13月': (dt(2026, 1, 1, 0, 0), dt(2026, 1, 31, 23, 59, 59)),
+    '2月30日': (dt(2025, 2, 27, 0, 0), dt(2025, 2, 27, 23, 59, 59)),
+    '明年2月29日': (dt(2026, 2, 27, 0, 0), dt(2026, 2, 27, 23, 59, 59)),
+    '8月31日': (dt(2025, 9, 1, 0, 0), dt(2025, 9, 1, 23, 59, 59)),
+    '1月31日': (dt(2025, 2, 3, 0, 0), dt(2025, 2, 3, 23, 59, 59)),
+    '下个月31号': (dt(2025, 10, 1, 0, 0), dt(2025, 10, 1, 23, 59, 59)),
+    '上个月': (dt(2025, 7, 1, 0, 0), dt(2025, 7, 30, 23, 59, 59)),
+    '明天25点': (dt(2025, 8, 22, 1, 0), dt(2025, 8, 22, 1, 59, 59)),
+}
+
+FIXED = {
+    '31日下午4点半': (dt(2025, 8, 31, 16, 30), dt(2025, 8, 31, 16, 30, 59)),
+    '0001年1月1日': (dt(1, 1, 1, 0, 0), dt(1, 1, 1, 23, 59, 59)),
+    '9999年12月31日 23:59:59': (dt(9999, 12, 31, 23, 59, 59), dt(9999, 12, 31, 23, 59, 59)),
+    '2024年2月29日': (dt(2024, 2, 29, 0, 0), dt(2024, 2, 29, 23, 59, 59)),
+    '2025年13月1日': -1,
+    '2025年2月30日': -1,
+    '2025年8月32日': -1,
+    '32天后': (dt(2025, 9, 21, 0, 0), dt(2025, 9, 21, 23, 59, 59)),
+    '40天后': (dt(2025, 9, 29, 0, 0), dt(2025, 9, 29, 23, 59, 59)),
+    '100天后': (dt(2025, 11, 28, 0, 0), dt(2025, 11, 28, 23, 59, 59)),
+    '45天前': (dt(2025, 7, 6, 0, 0), dt(2025, 7, 6, 23, 59, 59)),
+    '13月': -1,
+    '2月30日': -1,
+    '明年2月29日': -1,
+    '8月31日': (dt(2025, 8, 31, 0, 0), dt(2025, 8, 31, 23, 59, 59)),
+    '1月31日': (dt(2025, 1, 31, 0, 0), dt(2025, 1, 31, 23, 59, 59)),
+    '下个月31号': (dt(2025, 9, 30, 0, 0), dt(2025, 9, 30, 23, 59, 59)),
+    '上个月': (dt(2025, 7, 1, 0, 0), dt(2025, 7, 31, 23, 59, 59)),
+}
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return Parser()
+
+
+@pytest.mark.parametrize("text", list(BASELINE))
+def test_against_baseline(parser, text):
+    assert parser.parse(text, base=BASE) == FIXED.get(text, BASELINE[text])
+
+
+@pytest.mark.parametrize("days", [1, 11, 12, 29, 31, 32, 40, 45, 60, 100, 365, 1000])
+def test_relative_days_carry_over(parser, days):
+    # 超过一个月的天数也照样往后（往前）进位，和直接加 timedelta 一样
+    for text, sign in ((f"{days}天后", 1), (f"{days}天前", -1)):
+        day = datetime.datetime.combine((BASE + datetime.timedelta(days=sign * days)).date(), datetime.time())
+        assert parser.parse(text, base=BASE) == (day, day + datetime.timedelta(days=1, seconds=-1)), text
+
+
+@pytest.mark.parametrize("text", ["13月", "2月30日", "2025年8月32日", "明年2月29日", "下个月40号"])
+def test_invalid_calendar_day(parser, text):
+    assert parser.parse(text, base=BASE) == -1
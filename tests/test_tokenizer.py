@@ -0,0 +1,30 @@
+# 字典树分词要和 cutword 分得一样、解析出来一样：compare_test 的样例加上按模式生成的几千条。
+# 数字拆成几截（cutword 把“二〇二五”切成“二”“〇”“二五”）无所谓，merge_numerals 以后一样就行
+import datetime
+
+import pytest
+
+from cn2t import Parser, run_merge_num
+from cn2t.benchmarks.corpus import TESTINGS, generate
+
+pytest.importorskip("cutword")
+
+BASE = datetime.datetime(2025, 8, 15, 12)
+TEXTS = sorted(set(TESTINGS) | set(generate(5000, 5000)))
+
+
+@pytest.fixture(scope="module")
+def parsers():
+    return Parser(cache_size=0, tokenizer="cutword").warm(), Parser(cache_size=0, tokenizer="trie").warm()
+
+
+def test_same_tokens(parsers):
+    cutword, trie = parsers
+    diff = [text for text in TEXTS if run_merge_num(cutword.engine.cutter.cutword(text)) != run_merge_num(trie.engine.cutter.cutword(text))]
+    assert diff == []
+
+
+def test_same_results(parsers):
+    cutword, trie = parsers
+    diff = [text for text in TEXTS if cutword.parse(text, base=BASE) != trie.parse(text, base=BASE)]
+    assert diff == []
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+
+from .numeral import NUMERAL_CHARS
+
+# cutword 的替代品。有意义的词要么在词库里、要么是数字，所以用不着通用分词器：
+# 词库的词头建一棵字典树，每个位置取最长匹配；数字（阿拉伯、中文、混着写的）连成一串单独切
+# （词库里带数字的词，周一、初十、年三十，开头都不是数字，所以数字不会被词吃掉半截）；
+# 都不是的字连成一段，交给 add_tag 报“不认识的词”。不用写临时词典文件，也不用加载 cutword 的模型
+
+_END = ""  # 节点里用空串标记“到这里是一个完整的词”，不会和任何单个字冲突
+_SKIP = {"_NUM"}  # 词库里的占位符，不是真的词
+
+
+class TrieTokenizer:
+    # 接口和 cutword.Cutter 一样，Engine 里可以直接换
+    def __init__(self, keywords: Iterable[str]):
+        self._root: dict = {}
+        for keyword in keywords:
+            if not keyword or keyword in _SKIP:
+                continue
+            node = self._root
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[_END] = keyword
+
+    def cutword(self, text: str) -> list[str]:
+        root = self._root
+        tokens: list[str] = []
+        unknown = -1  # 正在攒的不认识的一段从哪开始
+        i, n = 0, len(text)
+        while i < n:
+            ch = text[i]
+            # 最长匹配
+            end = 0
+            node = root.get(ch)
+            j = i
+            while node is not None:
+                j += 1
+                if _END in node:
+                    end = j
+                if j >= n:
+                    break
+                node = node.get(text[j])
+            if ch in NUMERAL_CHARS or ch.isdecimal():
+                # 数字连成一串；自带词库里要是有数字开头的词（“一月”），哪个长用哪个
+                run = i + 1
+                while run < n and ((c := text[run]) in NUMERAL_CHARS or c.isdecimal()):
+                    run += 1
+                end = max(end, run)
+            elif not end:
+                if unknown < 0:
+                    unknown = i
+                i += 1
+                continue
+            if unknown >= 0:
+                tokens.append(text[unknown:i])
+                unknown = -1
+            tokens.append(text[i:end])
+            i = end
+        if unknown >= 0:
+            tokens.append(text[unknown:])
+        return tokens
+
+    def regex(self) -> str:
+        """字典树原样转成正则：公共前缀只写一次，每个位置只沿着一条路往下试，长的优先"""
+        return _regex(self._root)
+
+
+def _regex(node: dict) -> str:
+    branches = [re.escape(ch) + _regex(child) for ch, child in sorted(node.items()) if ch != _END]
+    if not branches:
+        return ""
+    body = "(?:" + "|".join(branches) + ")" if len(branches) > 1 or _END in node else branches[0]
+    return body + "?" if _END in node else body
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Iterable
+from typing import Any
+
+from .log import logger
+
+# 长期跑着的进程里改了词库不用重启：后台线程隔一会儿看一眼文件的 mtime 和大小，变了就叫 parser.reload()。
+# 只用标准库，轮询就够了（词库一天也改不了几次）；编辑器保存的时候可能先清空再写，所以要连着两次看到一样的才算改完
+
+_Stamp = tuple[tuple[int, int] | None, ...]
+
+
+class Watcher:
+    # parser 是有 reload() 的东西：Parser 或者 ParallelParser
+    def __init__(self, parser: Any, paths: Iterable[str], interval: float = 1.0):
+        self.parser = parser
+        self.paths = tuple(paths)
+        self.interval = interval
+        self.reloads = 0  # 成功换了几次
+        self.failures = 0
+        self._stamp = self._current()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cn2t-watch", daemon=True)
+
+    def _current(self) -> _Stamp:
+        stamps = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append(None)  # 正在被替换（先删后写）的时候可能短暂不存在
+        return tuple(stamps)
+
+    def _run(self):
+        seen = self._stamp
+        while not self._stop.wait(self.interval):
+            stamp = self._current()
+            if stamp == self._stamp or None in stamp:
+                continue
+            if stamp != seen:
+                seen = stamp  # 刚变，等下一轮确认写完了
+                continue
+            self._stamp = stamp
+            try:
+                self.parser.reload()
+                self.reloads += 1
+            except Exception:
+                self.failures += 1  # 文件再改一次会再试
+                logger.exception("词库或模板重新加载失败，继续用旧的")
+
+    def start(self) -> Watcher:
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self) -> Watcher:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()